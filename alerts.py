@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import smtplib
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional, Tuple
+
+
+def format_alert(alert: dict) -> str:
+    return (
+        f"🛸 Callsign: {alert['callsign']}\n"
+        f"📍 Location: Latitude {alert['latitude']}, Longitude {alert['longitude']}\n"
+        f"🚫 Restricted Zone: {alert['zone']}\n"
+        f"Time: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(alert['time']))}"
+    )
+
+
+# ✅ One message per burst: a single alert keeps the original wording, several become a digest
+def build_message(alerts: List[dict], sender: str, recipient: str) -> MIMEMultipart:
+    if len(alerts) == 1:
+        subject = "🚨 Unauthorized Drone Alert"
+        body = "An unauthorized drone has been detected!\n\n" + format_alert(alerts[0])
+    else:
+        subject = f"🚨 {len(alerts)} Unauthorized Drone Alerts"
+        body = f"{len(alerts)} unauthorized drones have been detected!\n\n" + "\n\n".join(format_alert(a) for a in alerts)
+
+    msg = MIMEMultipart()
+    msg["From"] = sender
+    msg["To"] = recipient
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+    return msg
+
+
+class AlertDispatcher:
+    """Delivers unauthorized-drone alerts off the polling path.
+
+    ``submit`` only applies the per-(drone, zone) cooldown and enqueues, so it never blocks a
+    cycle. A single worker task drains the queue, folds everything that arrives within
+    ``batch_window`` seconds into one digest and sends it over one reused SMTP connection,
+    retrying with exponential backoff and reconnecting when the server drops the session.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: Optional[str],
+        recipient: Optional[str],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = True,
+        cooldown: float = 300.0,
+        batch_window: float = 2.0,
+        max_batch: int = 50,
+        max_queue: int = 1000,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        timeout: float = 10.0,
+    ):
+        self.host, self.port, self.use_ssl, self.timeout = host, port, use_ssl, timeout
+        self.sender, self.recipient = sender, recipient
+        self.username, self.password = username, password
+        self.cooldown, self.batch_window, self.max_batch = cooldown, batch_window, max_batch
+        self.max_retries, self.backoff_base = max_retries, backoff_base
+        self.max_queue = max_queue
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_alerted: Dict[Tuple[str, str], float] = {}
+
+        # Counters exposed through stats()
+        self.submitted = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self.sent_messages = 0
+        self.sent_alerts = 0
+        self.failed_alerts = 0
+        self.retries = 0
+        self.send_latency_total = 0.0
+        self.last_send_latency = 0.0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.sender and self.recipient)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.create_task(self._run())
+        if not self.configured:
+            logging.warning("⚠️ Email credentials not configured — alert emails will be skipped.")
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self._disconnect)
+
+    # ✅ Called once per cycle from the producer: cooldown, dedup and enqueue only
+    def submit(self, drones: List[dict], now: Optional[float] = None) -> int:
+        if self._queue is None:
+            return 0
+        now = time.time() if now is None else now
+        queued = 0
+        for drone in drones:
+            key = (drone.get("icao24") or drone["callsign"], drone["zone"])
+            last = self._last_alerted.get(key)
+            if last is not None and now - last < self.cooldown:
+                self.suppressed += 1
+                continue
+            alert = {
+                "callsign": drone["callsign"],
+                "latitude": drone["latitude"],
+                "longitude": drone["longitude"],
+                "zone": drone["zone"] if drone["zone"] != "None" else "Unknown",
+                "time": now,
+            }
+            try:
+                self._queue.put_nowait(alert)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logging.warning(f"⚠️ Alert queue full; dropped alert for {key[0]} in {alert['zone']}")
+                continue
+            self._last_alerted[key] = now
+            self.submitted += 1
+            queued += 1
+
+        # Forget drones whose cooldown has expired so the dedup table stays bounded
+        self._last_alerted = {k: t for k, t in self._last_alerted.items() if now - t < self.cooldown}
+        return queued
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "suppressed": self.suppressed,
+            "dropped": self.dropped,
+            "sent_messages": self.sent_messages,
+            "sent_alerts": self.sent_alerts,
+            "failed_alerts": self.failed_alerts,
+            "retries": self.retries,
+            "last_send_latency": self.last_send_latency,
+            "avg_send_latency": self.send_latency_total / self.sent_messages if self.sent_messages else 0.0,
+        }
+
+    async def _next_batch(self) -> List[dict]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            # asyncio.wait rather than wait_for: on 3.11 wait_for can swallow the cancel from stop()
+            # when the get completes at the same moment, leaving the worker running forever
+            getter = asyncio.ensure_future(self._queue.get())
+            try:
+                done, _ = await asyncio.wait({getter}, timeout=remaining)
+            finally:
+                if not getter.done():
+                    getter.cancel()
+            if not done:
+                break
+            batch.append(getter.result())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            if not self.configured:
+                self.failed_alerts += len(batch)
+                continue
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: List[dict]):
+        msg = build_message(batch, self.sender, self.recipient)
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._send, msg)
+            except (smtplib.SMTPException, OSError) as e:
+                await asyncio.to_thread(self._disconnect)
+                if attempt == self.max_retries:
+                    self.failed_alerts += len(batch)
+                    logging.error(f"❌ Failed to send alert email for {len(batch)} drone(s): {e}")
+                    return
+                self.retries += 1
+                delay = self.backoff_base * 2 ** attempt
+                logging.warning(f"⚠️ Alert email failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            self.last_send_latency = time.perf_counter() - started
+            self.send_latency_total += self.last_send_latency
+            self.sent_messages += 1
+            self.sent_alerts += len(batch)
+            logging.info(f"✅ Alert email sent for {len(batch)} drone(s)")
+            return
+
+    # Blocking SMTP calls below run in a worker thread
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            if self.use_ssl:
+                server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+            else:
+                server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.username and self.password:
+                server.login(self.username, self.password)
+            self._smtp = server
+        return self._smtp
+
+    def _send(self, msg: MIMEMultipart):
+        self._connect().send_message(msg)
+
+    def _disconnect(self):
+        server, self._smtp = self._smtp, None
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
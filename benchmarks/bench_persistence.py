@@ -0,0 +1,67 @@
+"""Sustained drone_logs insert throughput at 10k observations per cycle.
+
+Feeds the ObservationWriter back-to-back cycles (no 10 s sleep) against the SQLite backend,
+flushing every 50k rows as in production, and reports rows per second end to end.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_persistence
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from persistence import ObservationWriter, SQLiteBackend
+
+ROWS_PER_CYCLE = 10_000
+CYCLES = 30
+
+
+def synthetic_cycle(rng):
+    lat, lon = rng.uniform(25, 49, ROWS_PER_CYCLE), rng.uniform(-124, -67, ROWS_PER_CYCLE)
+    return [
+        {
+            "icao24": f"{i:06x}", "callsign": f"CS{i}", "latitude": la, "longitude": lo,
+            "altitude": 3000.0, "velocity": 220.0, "unauthorized": i % 200 == 0,
+            "zone": "JFK Airport" if i % 200 == 0 else "None",
+        }
+        for i, (la, lo) in enumerate(zip(lat.tolist(), lon.tolist()))
+    ]
+
+
+async def run(path):
+    rng = np.random.default_rng(3)
+    cycles = [synthetic_cycle(rng) for _ in range(3)]
+    writer = ObservationWriter(SQLiteBackend(path), flush_rows=50_000, flush_interval=1.0)
+    writer.start()
+
+    submit_times = []
+    start = time.perf_counter()
+    for cycle in range(CYCLES):
+        t = time.perf_counter()
+        writer.submit(cycles[cycle % len(cycles)], timestamp=1_700_000_000 + cycle * 10)
+        submit_times.append(time.perf_counter() - t)
+        await asyncio.sleep(0)
+    while writer.pending_rows or writer.rows_written < CYCLES * ROWS_PER_CYCLE - writer.rows_dropped:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stats = writer.stats()
+    await writer.stop()
+
+    total = CYCLES * ROWS_PER_CYCLE
+    print(f"rows: {total:,} in {elapsed:.2f}s -> {total / elapsed:,.0f} rows/s sustained")
+    print(f"submit (event loop) per cycle: mean {np.mean(submit_times) * 1e3:.1f} ms, max {max(submit_times) * 1e3:.1f} ms")
+    print(f"flushes: {stats['flushes']}, last flush {stats['last_flush_seconds'] * 1e3:.0f} ms, dropped {stats['rows_dropped']}")
+    print(f"headroom at one cycle per 10 s: {total / elapsed * 10 / ROWS_PER_CYCLE:.0f}x")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(os.path.join(tmp, "bench.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Bytes per cycle and serialization time for the /ws wire formats on a 20k-aircraft feed.
+
+Between cycles most aircraft move a little, about 1% leave the feed and as many join.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_stream_protocol
+"""
+import json
+import time
+
+import numpy as np
+
+from stream_protocol import DeltaStream, encode_binary, encode_json
+
+AIRCRAFT = 20_000
+CYCLES = 5
+CHURN = 0.01
+STATIONARY = 0.3
+
+
+def synthetic_cycle(rng, icao24, lat, lon, alt, velocity, heading, cycle_id):
+    drones = [
+        {
+            "icao24": key, "callsign": f"CS{key[-4:].upper()}",
+            "latitude": la, "longitude": lo, "altitude": a, "geo_altitude": a,
+            "velocity": v, "true_track": h, "on_ground": False,
+            "unauthorized": i % 500 == 0, "zone": "JFK Airport" if i % 500 == 0 else "None",
+        }
+        for i, (key, la, lo, a, v, h) in enumerate(zip(icao24, lat.tolist(), lon.tolist(), alt.tolist(), velocity.tolist(), heading.tolist()))
+    ]
+    validation = {"total_drones": len(drones), "authorized": len(drones), "unauthorized": 0, "validation_passed": True}
+    return {"drones": drones, "validation": validation, "data_source": "simulation", "cycle_id": cycle_id}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def main():
+    rng = np.random.default_rng(7)
+    icao24 = [f"{i:06x}" for i in range(AIRCRAFT)]
+    next_id = AIRCRAFT
+    lat, lon = rng.uniform(25, 49, AIRCRAFT), rng.uniform(-124, -67, AIRCRAFT)
+    alt, velocity, heading = rng.uniform(0, 12000, AIRCRAFT), rng.uniform(50, 250, AIRCRAFT), rng.uniform(0, 360, AIRCRAFT)
+
+    stream = DeltaStream()
+    rows = []
+    for cycle_id in range(1, CYCLES + 1):
+        payload = synthetic_cycle(rng, icao24, lat, lon, alt, velocity, heading, cycle_id)
+        full, full_ms = timed(json.dumps, payload)
+        message, diff_ms = timed(stream.update, payload)
+        delta_json, json_ms = timed(encode_json, message)
+        delta_binary, binary_ms = timed(encode_binary, message)
+        rows.append((cycle_id, len(full), full_ms, len(delta_json), diff_ms + json_ms, len(delta_binary), diff_ms + binary_ms))
+
+        # 10 s of motion for most aircraft, some parked, plus churn at the edges of the feed
+        moving = rng.random(AIRCRAFT) > STATIONARY
+        step = velocity * 10 / 111_320
+        lat = lat + moving * step * np.cos(np.radians(heading))
+        lon = lon + moving * step * np.sin(np.radians(heading))
+        for i in rng.choice(AIRCRAFT, int(AIRCRAFT * CHURN), replace=False).tolist():
+            icao24[i] = f"{next_id:06x}"
+            next_id += 1
+
+    snapshot_json, snapshot_json_ms = timed(encode_json, stream.snapshot())
+    snapshot_binary, snapshot_binary_ms = timed(encode_binary, stream.snapshot())
+
+    print(f"{'cycle':>5} {'full KB':>9} {'full ms':>8} {'Δjson KB':>9} {'Δjson ms':>9} {'Δbin KB':>8} {'Δbin ms':>8}")
+    for cycle_id, full_b, full_ms, dj_b, dj_ms, db_b, db_ms in rows:
+        print(f"{cycle_id:>5} {full_b / 1024:>9.0f} {full_ms:>8.1f} {dj_b / 1024:>9.0f} {dj_ms:>9.1f} {db_b / 1024:>8.0f} {db_ms:>8.1f}")
+    print(f"snapshot on connect: json {len(snapshot_json) / 1024:.0f} KB in {snapshot_json_ms:.1f} ms, "
+          f"binary {len(snapshot_binary) / 1024:.0f} KB in {snapshot_binary_ms:.1f} ms")
+    print("(cycle 1 has no base, so it is a snapshot of every aircraft; delta ms includes the diff)")
+
+
+if __name__ == "__main__":
+    main()
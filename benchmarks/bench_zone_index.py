@@ -0,0 +1,74 @@
+"""Per-point geofence lookup cost as the restricted zone count grows.
+
+Zones are laid out at a constant density of about one per square degree, so the region
+grows with the zone count. The indexed cost should stay flat; the brute-force column
+scans every zone.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_zone_index
+"""
+import time
+
+import numpy as np
+
+from geofence import find_zones
+from zones import ZoneIndex
+
+ZONE_COUNTS = [10, 100, 1_000, 10_000, 50_000]
+POINTS = 10_000
+REPEATS = 5
+
+
+def region(count):
+    lat_span = min(160.0, np.sqrt(count))
+    lon_span = min(360.0, count / lat_span)
+    return (-lat_span / 2, lat_span / 2), (-180.0, -180.0 + lon_span)
+
+
+def synthetic_zones(count, rng):
+    # Zones scattered uniformly over the region, roughly 1 in 10 drawn as a polygon
+    lat_range, lon_range = region(count)
+    lat = rng.uniform(*lat_range, count)
+    lon = rng.uniform(*lon_range, count)
+    radius = rng.uniform(1.0, 15.0, count)
+    zones = []
+    for i in range(count):
+        if i % 10 == 0:
+            d = radius[i] / 111.32
+            zones.append({"name": f"Z{i}", "polygon": [[lat[i] - d, lon[i] - d], [lat[i] + d, lon[i] - d], [lat[i], lon[i] + d]]})
+        else:
+            zones.append({"name": f"Z{i}", "latitude": lat[i], "longitude": lon[i], "radius": radius[i]})
+    return zones
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rng = np.random.default_rng(42)
+
+    print(f"{'zones':>8} {'build ms':>10} {'index us/pt':>12} {'brute us/pt':>12}")
+    for count in ZONE_COUNTS:
+        zones = synthetic_zones(count, rng)
+        lat_range, lon_range = region(count)
+        lat = rng.uniform(*lat_range, POINTS)
+        lon = rng.uniform(*lon_range, POINTS)
+        start = time.perf_counter()
+        index = ZoneIndex(zones)
+        build = time.perf_counter() - start
+
+        indexed = best_of(lambda: index.lookup(lat, lon))
+        circles = [z for z in zones if "radius" in z]
+        brute = best_of(lambda: find_zones(lat, lon, circles)) if count <= 1_000 else float("nan")
+        print(f"{count:>8} {build * 1e3:>10.1f} {indexed / POINTS * 1e6:>12.3f} {brute / POINTS * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import pytest
+
+from data_sources import TrafficSimulator, to_opensky
+from zones import RESTRICTED_ZONES
+
+SIZES = [1_000, 10_000, 100_000]
+INTRUSION_RATE = 0.01
+
+
+def synthetic_states(count, seed=0):
+    """An OpenSky ``states/all`` list from the seeded simulator, ~1% of it drones near restricted zones."""
+    simulator = TrafficSimulator(RESTRICTED_ZONES, count, seed, INTRUSION_RATE, start_time=1_700_000_000)
+    return to_opensky(simulator.snapshot(), simulator.time)["states"]
+
+
+@pytest.fixture(scope="session", params=SIZES, ids=lambda n: f"{n // 1000}k")
+def raw_states(request):
+    return synthetic_states(request.param)
@@ -0,0 +1,178 @@
+"""Hot-path benchmarks for one polling cycle at 1k, 10k and 100k aircraft.
+
+    pip install -r requirements-dev.txt
+    python -m pytest --benchmark-columns=min,mean,max,rounds
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+import main
+from alerts import AlertDispatcher
+from data_sources import TrafficSimulator
+from hub import BroadcastHub
+from opensky_client import OpenSkyClient
+from opensky_stub import make_server
+from persistence import ObservationWriter, SQLiteBackend
+from state_vectors import parse_states
+from stream_protocol import DELTA, ENCODERS
+from tracks import ZONE_ENTER, TrackStore
+
+
+def rounds_for(count):
+    """Rounds for benchmarks that rebuild their state in a per-round setup."""
+    return max(5, 50_000 // count)
+
+
+@pytest.fixture(scope="module")
+def states(raw_states):
+    return parse_states(raw_states)
+
+
+@pytest.fixture(scope="module")
+def records(states):
+    return main.build_drone_records(states)
+
+
+@pytest.fixture(scope="module")
+def payload(records):
+    return {
+        "drones": records,
+        "validation": main.validate_drone_counts(records),
+        "zone_events": [],
+        "data_source": "live",
+        "cycle_id": 1,
+    }
+
+
+@pytest.fixture(scope="module")
+def next_payload(payload):
+    """The following cycle: every aircraft has moved, so a delta against ``payload`` is non-empty."""
+    drones = [{**d, "latitude": d["latitude"] + 0.01, "longitude": d["longitude"] + 0.01} for d in payload["drones"]]
+    return {**payload, "drones": drones, "cycle_id": 2}
+
+
+def test_fetch(benchmark, raw_states):
+    server = make_server([{"time": 1_700_000_000, "states": raw_states}], port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenSkyClient(f"http://127.0.0.1:{server.server_port}/api/states/all", cache_ttl=0)
+    loop = asyncio.new_event_loop()
+    try:
+        snapshot = benchmark.pedantic(lambda: loop.run_until_complete(client.fetch()), rounds=5, warmup_rounds=1)
+        assert len(snapshot.states) == len(raw_states)
+    finally:
+        loop.run_until_complete(client.close())
+        loop.close()
+        server.shutdown()
+
+
+def test_simulate(benchmark, raw_states):
+    simulator = TrafficSimulator(main.RESTRICTED_ZONES, len(raw_states), seed=0)
+    states = benchmark(lambda: (simulator.advance(), simulator.snapshot())[1])
+    assert len(states) == len(raw_states)
+
+
+def test_parse(benchmark, raw_states):
+    states = benchmark(parse_states, raw_states)
+    assert len(states) == len(raw_states)
+
+
+def test_geofence(benchmark, states):
+    index = main.zone_registry.index
+    zone_idx = benchmark(index.lookup, states.latitude, states.longitude, states.altitude)
+    assert (zone_idx >= 0).any()
+
+
+def test_build_records(benchmark, states):
+    records = benchmark(main.build_drone_records, states)
+    assert len(records) == len(states)
+
+
+def test_validate(benchmark, records):
+    result = benchmark(main.validate_drone_counts, records)
+    assert result["validation_passed"]
+
+
+def test_tracks(benchmark, records):
+    store = TrackStore(capacity=len(records), history=32)
+    clock = iter(range(1_700_000_000, 1_800_000_000, 10))
+    benchmark(lambda: store.update(records, next(clock)))
+    assert len(store) == len(records)
+
+
+def test_alerting(benchmark, records):
+    events = [{**r, "type": ZONE_ENTER} for r in records if r["unauthorized"]]
+
+    async def run():
+        # A fresh dispatcher per round, otherwise every round after the first only hits the cooldown
+        dispatchers = []
+
+        def setup():
+            dispatcher = AlertDispatcher("127.0.0.1", 1, "bench@localhost", "bench@localhost", use_ssl=False,
+                                         max_queue=len(events))
+            dispatcher.start()
+            dispatchers.append(dispatcher)
+            return (events,), {}
+
+        try:
+            benchmark.pedantic(lambda events: dispatchers[-1].submit(events), setup=setup, rounds=rounds_for(len(records)))
+        finally:
+            for dispatcher in dispatchers:
+                await dispatcher.stop()
+        return dispatchers
+
+    dispatchers = asyncio.run(run())
+    assert all(d.submitted == len(events) and d.suppressed == 0 for d in dispatchers)
+
+
+def test_persist(benchmark, records):
+    # A fresh writer per round, otherwise later rounds overflow the pending cap and time the drop path
+    writers = []
+
+    def setup():
+        writers.append(ObservationWriter(SQLiteBackend(":memory:"), max_pending_rows=len(records)))
+        return (records, 1_700_000_000), {}
+
+    benchmark.pedantic(lambda records, now: writers[-1].submit(records, now), setup=setup, rounds=rounds_for(len(records)))
+    assert all(w.pending_rows == len(records) and w.rows_dropped == 0 for w in writers)
+
+
+@pytest.mark.parametrize("channels", [{main.FULL_CHANNEL}, {main.FULL_CHANNEL, *(f"delta-{e}" for e in ENCODERS)}],
+                         ids=["full", "full+delta"])
+def test_serialize(benchmark, payload, next_payload, channels):
+    def setup():
+        # Each round encodes cycle 2 against a stream that has just seen cycle 1
+        main.delta_stream.reset()
+        main.encode_cycle(payload, channels)
+        return (next_payload, channels), {}
+
+    frames = benchmark.pedantic(main.encode_cycle, setup=setup, rounds=rounds_for(len(payload["drones"])))
+    assert json.loads(frames[main.FULL_CHANNEL])["cycle_id"] == 2
+    if "delta-json" in channels:
+        message = json.loads(frames["delta-json"])
+        assert message["type"] == DELTA and len(message["moved"]) == len(next_payload["drones"])
+    main.delta_stream.reset()
+
+
+def test_ws_fanout(benchmark, payload):
+    frame = json.dumps(payload)
+
+    async def run():
+        # Fresh subscriber queues per round so every publish is a real enqueue, never a drop
+        hubs = []
+
+        def setup():
+            hub = BroadcastHub(queue_size=4)
+            for _ in range(100):
+                hub.subscribe(main.FULL_CHANNEL)
+            hubs.append(hub)
+            return ({main.FULL_CHANNEL: frame},), {}
+
+        benchmark.pedantic(lambda frames: hubs[-1].publish(frames), setup=setup, rounds=100)
+        return hubs
+
+    hubs = asyncio.run(run())
+    assert all(len(hub.subscribers) == 100 for hub in hubs)
+    assert all(s.queue.qsize() == 1 for hub in hubs for s in hub.subscribers)
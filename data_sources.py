@@ -0,0 +1,305 @@
+"""Where each polling cycle's aircraft come from.
+
+Every source has ``async fetch(bbox) -> SourceSnapshot``, an ``interval`` (seconds until the
+producer should fetch again) and ``async close()``:
+
+* ``LiveSource``: OpenSky through the pooled client, with a small simulated fleet as fallback.
+* ``TrafficSimulator``: a seeded fleet of up to ~100k aircraft moved by vectorized kinematics.
+* ``ReplaySource``: recorded ``states/all`` bodies streamed from disk at 1x-100x speed.
+
+Record a simulated session in the format ``ReplaySource`` and ``opensky_stub.py`` read:
+
+    python data_sources.py record sim.jsonl.gz --aircraft 100000 --cycles 360 --seed 1
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import math
+import time
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from opensky_client import OpenSkyClient, OpenSkyError
+from state_vectors import StateVectors
+from zones import KM_PER_DEGREE, normalize_zone
+
+BBox = Tuple[float, float, float, float]
+
+METRES_PER_DEGREE = KM_PER_DEGREE * 1000
+CONUS_BBOX = (24.5, -125.0, 49.5, -66.5)
+
+
+class SourceSnapshot(NamedTuple):
+    # Raw ``states/all`` rows (live, replay) or already columnar vectors (simulator)
+    states: Union[List[list], StateVectors]
+    source: str
+
+
+class LiveSource:
+    """OpenSky ``states/all``; cycles where it fails or comes back empty use ``fallback`` instead."""
+
+    name = "live"
+
+    def __init__(self, client: OpenSkyClient, interval: float = 10.0, fallback: Optional["TrafficSimulator"] = None):
+        self.client = client
+        self.interval = interval
+        self.fallback = fallback
+
+    async def fetch(self, bbox: Optional[BBox] = None) -> SourceSnapshot:
+        try:
+            snapshot = await self.client.fetch(bbox)
+            if snapshot.states:
+                return SourceSnapshot(snapshot.states, "live" if snapshot.fresh else "stale-cached")
+        except OpenSkyError as e:
+            logging.error(f"❌ OpenSky API error: {str(e)}. Using simulated data.")
+        if self.fallback is None:
+            return SourceSnapshot([], self.name)
+        return await self.fallback.fetch(bbox)
+
+    async def close(self):
+        await self.client.close()
+
+
+class TrafficSimulator:
+    """Seeded, deterministic traffic: the same ``seed`` always produces the same flights.
+
+    Most aircraft are cruising traffic spread over ``area``: each keeps a speed, a slowly
+    changing turn rate and a climb/descent rate, and bounces off the area edges. A share
+    ``intrusion_rate`` of them are low, slow drones circling restricted zones on orbits that
+    cross the boundary, so they keep entering and leaving. Each ``fetch`` advances the fleet by
+    ``step_seconds`` of simulated time; ``speed`` shortens the real time between cycles.
+    """
+
+    name = "simulation"
+
+    def __init__(
+        self,
+        zones: List[dict],
+        count: int = 10_000,
+        seed: int = 0,
+        intrusion_rate: float = 0.01,
+        area: Optional[BBox] = None,
+        step_seconds: float = 10.0,
+        speed: float = 1.0,
+        start_time: Optional[float] = None,
+    ):
+        if not speed > 0:
+            raise ValueError(f"speed must be greater than 0, got {speed}")
+        zones = [normalize_zone(z) for z in zones]
+        self.area = area or CONUS_BBOX
+        self.step_seconds = step_seconds
+        self.interval = step_seconds / speed
+        self.time = float(int(time.time()) if start_time is None else start_time)
+        self._rng = rng = np.random.default_rng(seed)
+
+        intruders = min(round(count * intrusion_rate), count) if zones else 0
+        traffic = count - intruders
+        self.icao24 = np.array([f"{0xA00000 + i:06x}" for i in range(count)], dtype=str)
+        self.callsign = np.array([f"SIM{i}" for i in range(traffic)] + [f"UAV{i}" for i in range(intruders)], dtype=str)
+
+        # Cruising traffic: position, heading (deg), ground speed (m/s), turn rate (deg/s), climb (m/s)
+        lamin, lomin, lamax, lomax = self.area
+        self.lat = rng.uniform(lamin, lamax, traffic)
+        self.lon = rng.uniform(lomin, lomax, traffic)
+        self.alt = rng.uniform(1_000, 12_000, traffic)
+        self.heading = rng.uniform(0, 360, traffic)
+        self.velocity = rng.uniform(60, 260, traffic)
+        self.turn = rng.normal(0, 0.05, traffic)
+        self.climb = np.where(rng.random(traffic) < 0.7, 0.0, rng.uniform(-12, 12, traffic))
+
+        # Drones: each circles a point near one zone's centre on an orbit that crosses its edge
+        zone_id = rng.integers(0, len(zones), intruders) if intruders else np.empty(0, dtype=np.int64)
+        zone_lat = np.array([z["latitude"] for z in zones])[zone_id] if intruders else np.empty(0)
+        zone_lon = np.array([z["longitude"] for z in zones])[zone_id] if intruders else np.empty(0)
+        zone_radius = np.array([z["radius"] for z in zones])[zone_id] if intruders else np.empty(0)
+        zone_floor = np.array([z["floor"] or 0.0 for z in zones])[zone_id] if intruders else np.empty(0)
+        zone_ceiling = np.array([z["ceiling"] or math.inf for z in zones])[zone_id] if intruders else np.empty(0)
+        offset_km, offset_bearing = zone_radius * rng.uniform(0, 0.5, intruders), rng.uniform(0, 2 * np.pi, intruders)
+        self.orbit_lat = zone_lat + offset_km * np.cos(offset_bearing) / KM_PER_DEGREE
+        self.orbit_lon = zone_lon + offset_km * np.sin(offset_bearing) / (KM_PER_DEGREE * np.cos(np.radians(zone_lat)))
+        self.orbit_radius = np.maximum(zone_radius * rng.uniform(0.6, 1.1, intruders), 0.05) * 1000
+        self.orbit_angle = rng.uniform(0, 2 * np.pi, intruders)
+        self.drone_velocity = rng.uniform(5, 25, intruders)
+        self.orbit_direction = rng.choice([-1.0, 1.0], intruders)
+        self.drone_alt = np.minimum(zone_floor + rng.uniform(30, 300, intruders), np.maximum(zone_ceiling - 10, zone_floor))
+
+    def __len__(self):
+        return len(self.icao24)
+
+    def advance(self):
+        """Move every aircraft forward by ``step_seconds``."""
+        dt, rng = self.step_seconds, self._rng
+        self.time += dt
+
+        # Cruising traffic: occasionally pick a new turn rate, then fly the heading and climb
+        retune = rng.random(len(self.turn)) < dt / 300
+        self.turn[retune] = rng.normal(0, 0.05, int(retune.sum()))
+        self.heading = (self.heading + self.turn * dt) % 360
+        heading = np.radians(self.heading)
+        distance = self.velocity * dt
+        self.lat += distance * np.cos(heading) / METRES_PER_DEGREE
+        self.lon += distance * np.sin(heading) / (METRES_PER_DEGREE * np.cos(np.radians(self.lat)))
+        self.alt += self.climb * dt
+        level_off = (self.alt < 1_000) | (self.alt > 12_000)
+        self.alt = np.clip(self.alt, 1_000, 12_000)
+        self.climb[level_off] = -self.climb[level_off]
+
+        # Bounce off the simulated area instead of flying out of it
+        lamin, lomin, lamax, lomax = self.area
+        off_lat = (self.lat < lamin) | (self.lat > lamax)
+        off_lon = (self.lon < lomin) | (self.lon > lomax)
+        self.heading[off_lat] = (180 - self.heading[off_lat]) % 360
+        self.heading[off_lon] = (360 - self.heading[off_lon]) % 360
+        self.lat = np.clip(self.lat, lamin, lamax)
+        self.lon = np.clip(self.lon, lomin, lomax)
+
+        self.orbit_angle += self.orbit_direction * self.drone_velocity * dt / self.orbit_radius
+
+    def snapshot(self) -> StateVectors:
+        """The fleet's current state in the same columnar form ``parse_states`` produces."""
+        north = self.orbit_radius * np.cos(self.orbit_angle)
+        east = self.orbit_radius * np.sin(self.orbit_angle)
+        drone_lat = self.orbit_lat + north / METRES_PER_DEGREE
+        drone_lon = self.orbit_lon + east / (METRES_PER_DEGREE * np.cos(np.radians(self.orbit_lat)))
+        # Tangent to the orbit, in the direction of travel
+        drone_heading = (np.degrees(np.arctan2(east, north)) + 90 * self.orbit_direction) % 360
+
+        altitude = np.concatenate([self.alt, self.drone_alt])
+        count = len(self)
+        return StateVectors(
+            icao24=self.icao24,
+            callsign=self.callsign,
+            last_contact=np.full(count, self.time),
+            latitude=np.concatenate([self.lat, drone_lat]),
+            longitude=np.concatenate([self.lon, drone_lon]),
+            baro_altitude=altitude,
+            geo_altitude=altitude + 30,
+            velocity=np.concatenate([self.velocity, self.drone_velocity]),
+            heading=np.concatenate([self.heading, drone_heading]),
+            vertical_rate=np.concatenate([self.climb, np.zeros(len(self.drone_alt))]),
+            on_ground=np.zeros(count, dtype=bool),
+        )
+
+    async def fetch(self, bbox: Optional[BBox] = None) -> SourceSnapshot:
+        # The whole fleet every cycle: the simulator exists to load the pipeline, so no bbox filter
+        self.advance()
+        return SourceSnapshot(self.snapshot(), self.name)
+
+    async def close(self):
+        pass
+
+
+class ReplaySource:
+    """Recorded ``states/all`` bodies (JSON lines, optionally gzipped), one per cycle.
+
+    The file is read a line at a time (one snapshot ahead), so recordings larger than memory
+    replay fine. After each snapshot, the recorded ``time`` gap to the next one, divided by
+    ``speed``, sets the cycle interval.
+    At the end of the file the replay starts over when ``loop`` is set.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True, default_gap: float = 10.0):
+        if not speed > 0:
+            raise ValueError(f"speed must be greater than 0, got {speed}")
+        self.path, self.speed, self.loop, self.default_gap = path, speed, loop, default_gap
+        self.interval = default_gap / speed
+        self._file = None
+        self._has_lines = False
+        self._next: Optional[dict] = None
+        self.replayed = 0
+        self.loops = 0
+
+    def _open(self):
+        return gzip.open(self.path, "rt") if self.path.endswith(".gz") else open(self.path)
+
+    def _read_body(self) -> Optional[dict]:
+        if self._file is None:
+            self._file = self._open()
+        for line in self._file:
+            if line.strip():
+                self._has_lines = True
+                return json.loads(line)
+        if not self.loop or not self._has_lines:
+            return None
+        self._file.close()
+        self._file = self._open()
+        self.loops += 1
+        logging.info(f"✅ Replay of {self.path} finished; starting over (loop {self.loops})")
+        return self._read_body()
+
+    def _advance(self) -> Tuple[Optional[dict], Optional[dict]]:
+        # Read one snapshot ahead: the wait after this one is the recorded gap to the next
+        body = self._next if self._next is not None else self._read_body()
+        self._next = self._read_body() if body is not None else None
+        return body, self._next
+
+    async def fetch(self, bbox: Optional[BBox] = None) -> SourceSnapshot:
+        # Decoding a 100k-aircraft line takes a while, so keep it off the event loop
+        body, following = await asyncio.to_thread(self._advance)
+        if body is None:
+            return SourceSnapshot([], self.name)
+        recorded = body.get("time")
+        upcoming = following.get("time") if following is not None else None
+        # Loop restarts (time going backwards) and untimed bodies use the default gap
+        gap = upcoming - recorded if recorded is not None and upcoming is not None and upcoming > recorded else self.default_gap
+        self.interval = gap / self.speed
+        self.replayed += 1
+        return SourceSnapshot(body.get("states") or [], self.name)
+
+    async def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def to_opensky(states: StateVectors, timestamp: float) -> dict:
+    """Render state vectors as a ``states/all`` response body."""
+    def nullable(column):
+        return [None if math.isnan(v) else v for v in column.tolist()]
+
+    columns = (
+        states.icao24.tolist(), states.callsign.tolist(), states.last_contact.tolist(),
+        states.longitude.tolist(), states.latitude.tolist(), nullable(states.baro_altitude),
+        states.on_ground.tolist(), nullable(states.velocity), nullable(states.heading),
+        nullable(states.vertical_rate), nullable(states.geo_altitude),
+    )
+    return {
+        "time": int(timestamp),
+        "states": [
+            [icao24, callsign, "Simulated", int(contact), int(contact), lon, lat, baro, ground,
+             velocity, heading, vrate, None, geo, None, False, 0]
+            for icao24, callsign, contact, lon, lat, baro, ground, velocity, heading, vrate, geo in zip(*columns)
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record simulated traffic as a replayable states/all JSON-lines file")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    record = subcommands.add_parser("record")
+    record.add_argument("output", help="JSON-lines file to write (.gz to compress)")
+    record.add_argument("--aircraft", type=int, default=10_000)
+    record.add_argument("--cycles", type=int, default=360)
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--intrusion-rate", type=float, default=0.01)
+    record.add_argument("--step", type=float, default=10.0, help="simulated seconds between snapshots")
+    record.add_argument("--zones", help="restricted zones JSON file (default: the built-in zones)")
+    args = parser.parse_args()
+
+    if args.zones:
+        from zones import load_zones_file
+        zones = load_zones_file(args.zones)
+    else:
+        from zones import RESTRICTED_ZONES as zones
+
+    simulator = TrafficSimulator(zones, args.aircraft, args.seed, args.intrusion_rate, step_seconds=args.step)
+    with (gzip.open(args.output, "wt") if args.output.endswith(".gz") else open(args.output, "w")) as out:
+        for _ in range(args.cycles):
+            simulator.advance()
+            out.write(json.dumps(to_opensky(simulator.snapshot(), simulator.time)) + "\n")
+    print(f"🛰️ Recorded {args.cycles} snapshots of {args.aircraft} aircraft to {args.output}")
@@ -0,0 +1,38 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+
+# ✅ Broadcasted haversine: any mix of scalars and arrays, distance in km
+def haversine_np(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    dlat, dlon = lat2 - lat1, lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def zone_arrays(zones):
+    """Split a list of circular zone dicts into (latitude, longitude, radius) arrays."""
+    return (
+        np.array([z["latitude"] for z in zones], dtype=np.float64),
+        np.array([z["longitude"] for z in zones], dtype=np.float64),
+        np.array([z["radius"] for z in zones], dtype=np.float64),
+    )
+
+
+# ✅ Check every point against every zone in one pass
+def find_zones(latitude, longitude, zones):
+    """Return, per point, the index of the first zone containing it, or -1 when it is in none.
+
+    Points are checked against all zones at once with an (N, Z) distance matrix, so zone
+    order decides ties exactly like the scalar loop it replaces.
+    """
+    latitude = np.atleast_1d(np.asarray(latitude, dtype=np.float64))
+    longitude = np.atleast_1d(np.asarray(longitude, dtype=np.float64))
+    if not len(zones) or not len(latitude):
+        return np.full(len(latitude), -1, dtype=np.intp)
+
+    zone_lat, zone_lon, zone_radius = zone_arrays(zones)
+    distance = haversine_np(latitude[:, None], longitude[:, None], zone_lat[None, :], zone_lon[None, :])
+    inside = distance <= zone_radius[None, :]
+    return np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
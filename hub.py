@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Dict, Set
+
+
+class Subscriber:
+    """One connected client: a bounded queue of pre-serialized frames.
+
+    When the client falls behind and the queue is full, the oldest frame is dropped so a
+    stalled browser costs at most ``maxsize`` frames of memory and never blocks the producer.
+    """
+
+    def __init__(self, maxsize: int, channel: str):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.channel = channel
+        self.dropped = 0
+
+    def push(self, frame):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    def reset(self, frame):
+        """Discard anything queued and start over from ``frame`` (used for resyncs)."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class BroadcastHub:
+    """Fan-out of one serialized payload per cycle and channel to every subscriber.
+
+    A channel is one wire format (e.g. full JSON, JSON deltas, binary deltas). The producer
+    encodes a cycle once per channel that has subscribers and every client on that channel
+    receives the same frame object.
+    """
+
+    def __init__(self, queue_size: int = 4):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscriber] = set()
+
+    def channels(self) -> Set[str]:
+        return {subscriber.channel for subscriber in self.subscribers}
+
+    def subscribe(self, channel: str, initial_frame=None) -> Subscriber:
+        subscriber = Subscriber(self.queue_size, channel)
+        # New clients get the current cycle straight away instead of waiting for the next one
+        if initial_frame is not None:
+            subscriber.push(initial_frame)
+        self.subscribers.add(subscriber)
+        logging.info(f"🔌 WebSocket client subscribed to {channel} ({len(self.subscribers)} connected)")
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+        logging.info(f"🔌 WebSocket client unsubscribed ({len(self.subscribers)} connected)")
+
+    def publish(self, frames: Dict[str, object]):
+        for subscriber in list(self.subscribers):
+            frame = frames.get(subscriber.channel)
+            if frame is not None:
+                subscriber.push(frame)
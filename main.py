@@ -1,19 +1,28 @@
 import os
-import smtplib
-import requests
 import uvicorn
 import json
 import asyncio
 import logging
 import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from math import radians, cos, sin, sqrt, atan2
-import random
-from typing import List
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from typing import List, Optional
+import numpy as np
+from geofence import haversine_np
+from state_vectors import StateVectors, parse_states
+from zones import RESTRICTED_ZONES, ZoneRegistry
+from hub import BroadcastHub
+from stream_protocol import DeltaStream, ENCODERS
+from alerts import AlertDispatcher
+from tracks import TrackStore, ZONE_ENTER
+from opensky_client import OpenSkyClient
+from data_sources import LiveSource, ReplaySource, TrafficSimulator
+from persistence import ObservationWriter, PostgresBackend, SQLiteBackend
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import metrics
+from metrics import STAGE_SECONDS
 
 # ✅ Load environment variables
 load_dotenv()
@@ -22,20 +31,113 @@ load_dotenv()
 logging.basicConfig(filename="drone_tracking.log", level=logging.INFO, 
                     format="%(asctime)s - %(levelname)s - %(message)s")
 
-app = FastAPI()
+# ✅ Start the single polling producer with the app and stop it on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global observation_writer
+    backend = await asyncio.to_thread(make_persistence_backend)
+    if backend is not None:
+        # The local SQLite log keeps a day by default; PostgreSQL keeps everything unless told otherwise
+        default_hours = "24" if isinstance(backend, SQLiteBackend) else "0"
+        retention_hours = float(os.getenv("DRONE_LOGS_RETENTION_HOURS", default_hours))
+        observation_writer = ObservationWriter(backend, retention=retention_hours * 3600 or None)
+        observation_writer.start()
+    alert_dispatcher.start()
+    producer = asyncio.create_task(poll_drones())
+    try:
+        yield
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        await alert_dispatcher.stop()
+        await data_source.close()
+        await opensky_client.close()
+        if observation_writer is not None:
+            await observation_writer.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # ✅ Cycle counter and data source tracker (added for frontend telemetry)
 _cycle_id = 0
 _data_source = "simulation"
 
-# ✅ OpenSky API URL
-OPENSKY_URL = "https://opensky-network.org/api/states/all"
+# ✅ Polling period, latest cycle cache and the WebSocket fan-out hub
+POLL_INTERVAL = 10
+WS_QUEUE_SIZE = 4
+_latest_payload = None
+_latest_frame = None
+hub = BroadcastHub(queue_size=WS_QUEUE_SIZE)
+
+# ✅ Opt-in delta stream: /ws?protocol=delta&encoding=json|binary (default stays full JSON frames)
+FULL_CHANNEL = "full"
+delta_stream = DeltaStream()
+
+# ✅ Server-side track history (fixed-size ring buffers) and zone entry/exit detection
+track_store = TrackStore(
+    capacity=int(os.getenv("TRACK_CAPACITY", "50000")),
+    history=int(os.getenv("TRACK_HISTORY", "32")),
+)
+
+# ✅ drone_logs persistence is opt-in: PERSISTENCE=postgres (needs DB_HOST) or PERSISTENCE=sqlite
+observation_writer = None
+
+def make_persistence_backend():
+    mode = os.getenv("PERSISTENCE", "off")
+    if mode == "postgres":
+        if not os.getenv("DB_HOST"):
+            logging.warning("⚠️ PERSISTENCE=postgres but DB_HOST is not set; drone logging is off.")
+            return None
+        dsn = (
+            f"dbname={os.getenv('DB_NAME')} user={os.getenv('DB_USER')} password={os.getenv('DB_PASSWORD')} "
+            f"host={os.getenv('DB_HOST')} port={os.getenv('DB_PORT', '5432')}"
+        )
+        try:
+            return PostgresBackend(dsn)
+        except Exception as e:
+            logging.error(f"❌ PostgreSQL unavailable ({e}); drone logging is off.")
+            return None
+    if mode == "sqlite":
+        return SQLiteBackend(os.getenv("SQLITE_PATH", "drone_logs.db"))
+    return None
+
+# ✅ OpenSky API URL and pooled client (snapshot cache shared by every caller in a data window)
+OPENSKY_URL = os.getenv("OPENSKY_URL", "https://opensky-network.org/api/states/all")
+opensky_client = OpenSkyClient(
+    OPENSKY_URL,
+    username=os.getenv("OPENSKY_USERNAME"),
+    password=os.getenv("OPENSKY_PASSWORD"),
+    cache_ttl=float(os.getenv("OPENSKY_CACHE_TTL", "5")),
+    max_stale=float(os.getenv("OPENSKY_MAX_STALE", "60")),
+)
 
 # ✅ Email Credentials from .env
 EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 ALERT_EMAIL = os.getenv("ALERT_EMAIL")
 
+# ✅ Alert delivery: queued, deduplicated per (drone, zone) and sent off the polling path
+alert_dispatcher = AlertDispatcher(
+    host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+    port=int(os.getenv("SMTP_PORT", "465")),
+    use_ssl=os.getenv("SMTP_SSL", "true").lower() == "true",
+    sender=EMAIL_ADDRESS,
+    recipient=ALERT_EMAIL,
+    username=EMAIL_ADDRESS,
+    password=EMAIL_PASSWORD,
+    cooldown=float(os.getenv("ALERT_COOLDOWN", "300")),
+)
+
+# ✅ Gauges read live from the components they describe whenever /metrics is scraped
+metrics.WS_CLIENTS.set_function(lambda: len(hub.subscribers))
+metrics.WS_FRAMES_DROPPED.set_function(lambda: sum(s.dropped for s in list(hub.subscribers)))
+metrics.ALERT_QUEUE_DEPTH.set_function(lambda: alert_dispatcher.queue_depth)
+metrics.ALERT_SEND_SECONDS.set_function(lambda: alert_dispatcher.last_send_latency)
+metrics.PERSISTENCE_PENDING.set_function(lambda: observation_writer.pending_rows if observation_writer is not None else 0)
+metrics.TRACKS.set_function(lambda: len(track_store))
+
 # ✅ Allow CORS for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -45,32 +147,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ Restricted Zones
-RESTRICTED_ZONES = [
-    {"name": "JFK Airport", "latitude": 40.6413, "longitude": -73.7781, "radius": 10},
-    {"name": "Los Angeles Airport", "latitude": 33.9416, "longitude": -118.4085, "radius": 10},
-    {"name": "Hartsfield-Jackson Atlanta Airport", "latitude": 33.6407, "longitude": -84.4277, "radius": 10},
-    {"name": "Denver International Airport", "latitude": 39.8561, "longitude": -104.6737, "radius": 10},
-    {"name": "Chicago O'Hare Airport", "latitude": 41.9742, "longitude": -87.9073, "radius": 10},
-    {"name": "Pentagon", "latitude": 38.8719, "longitude": -77.0563, "radius": 5},
-    {"name": "Area 51", "latitude": 37.2431, "longitude": -115.7930, "radius": 15},
-]
+# ✅ Zone index: built-in zones by default, or a JSON file that is hot-reloaded when it changes
+zone_registry = ZoneRegistry(os.getenv("RESTRICTED_ZONES_FILE"), RESTRICTED_ZONES)
+
+# ✅ Data source: DATA_SOURCE=live (OpenSky, default), sim (seeded simulator) or replay (recorded snapshots)
+def make_data_source():
+    mode = os.getenv("DATA_SOURCE", "live")
+    speed = float(os.getenv("SOURCE_SPEED", "1"))
+    if not speed > 0:
+        raise ValueError(f"SOURCE_SPEED must be greater than 0, got {speed}")
+    if mode == "sim":
+        return TrafficSimulator(
+            zone_registry.index.zones,
+            count=int(os.getenv("SIM_AIRCRAFT", "10000")),
+            seed=int(os.getenv("SIM_SEED", "0")),
+            intrusion_rate=float(os.getenv("SIM_INTRUSION_RATE", "0.01")),
+            step_seconds=POLL_INTERVAL,
+            speed=speed,
+        )
+    if mode == "replay":
+        return ReplaySource(os.environ["REPLAY_PATH"], speed=speed)
+    # A small seeded fleet keeps the map populated while OpenSky is unreachable
+    fallback = TrafficSimulator(zone_registry.index.zones, count=20, intrusion_rate=0.3, step_seconds=POLL_INTERVAL)
+    return LiveSource(opensky_client, interval=POLL_INTERVAL, fallback=fallback)
+
+data_source = make_data_source()
 
 # ✅ Haversine formula to check if a drone is in a restricted area
 def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Radius of Earth in km
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat, dlon = lat2 - lat1, lon2 - lon1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    return 2 * R * atan2(sqrt(a), sqrt(1 - a))
-
-# ✅ Check if drone is in a restricted zone
-def is_unauthorized_flight(latitude, longitude):
-    for zone in RESTRICTED_ZONES:
-        distance = haversine(latitude, longitude, zone["latitude"], zone["longitude"])
-        if distance <= zone["radius"]:
-            return True, zone["name"]
-    return False, None
+    return float(haversine_np(lat1, lon1, lat2, lon2))
+
+# ✅ Check if drone is in a restricted zone (scalar wrapper over the batch geofence)
+def is_unauthorized_flight(latitude, longitude, altitude=None):
+    index = zone_registry.index
+    zone_idx = int(index.lookup(latitude, longitude, altitude)[0])
+    if zone_idx < 0:
+        return False, None
+    return True, index.zones[zone_idx]["name"]
+
+# ✅ Geofence a whole snapshot at once and build the drone records sent to clients
+def build_drone_records(states: StateVectors) -> List[dict]:
+    index = zone_registry.index
+    with STAGE_SECONDS.labels("geofence").time():
+        zone_idx = index.lookup(states.latitude, states.longitude, states.altitude)
+    zone_names = index.zone_names(zone_idx)
+    altitude = np.nan_to_num(states.altitude).tolist()
+    geo_altitude = np.nan_to_num(states.geo_altitude).tolist()
+    velocity = np.nan_to_num(states.velocity).tolist()
+    heading = np.nan_to_num(states.heading).tolist()
+
+    return [
+        {
+            "icao24": icao24,
+            "callsign": callsign or icao24,
+            "latitude": lat,
+            "longitude": lon,
+            "altitude": alt,
+            "geo_altitude": geo_alt,
+            "velocity": vel,
+            "true_track": track,
+            "on_ground": on_ground,
+            "unauthorized": idx >= 0,
+            "zone": zone,
+        }
+        for icao24, callsign, lat, lon, alt, geo_alt, vel, track, on_ground, idx, zone in zip(
+            states.icao24.tolist(), states.callsign.tolist(), states.latitude.tolist(),
+            states.longitude.tolist(), altitude, geo_altitude, velocity, heading,
+            states.on_ground.tolist(), zone_idx.tolist(), zone_names.tolist(),
+        )
+    ]
 
 # ✅ Validate Drone Data
 def validate_drone_counts(drone_data):
@@ -85,129 +230,251 @@ def validate_drone_counts(drone_data):
         "validation_passed": (authorized_count + unauthorized_count) == total_drones
     }
 
-# ✅ Send Alert Email
-def send_alert_email(callsign: str, latitude: float, longitude: float, zone_name: str):
-    subject = "🚨 Unauthorized Drone Alert"
-    body = (
-        f"An unauthorized drone has been detected!\n\n"
-        f"🛸 Callsign: {callsign}\n"
-        f"📍 Location: Latitude {latitude}, Longitude {longitude}\n"
-        f"🚫 Restricted Zone: {zone_name}\n\n"
-        f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}"
-    )
-
-    msg = MIMEMultipart()
-    msg["From"] = EMAIL_ADDRESS
-    msg["To"] = ALERT_EMAIL
-    msg["Subject"] = subject
-    msg.attach(MIMEText(body, "plain"))
-
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD or not ALERT_EMAIL:
-        logging.warning("⚠️ Email credentials not configured — skipping alert email.")
-        return
+# ✅ Fetch one cycle from the configured data source (run only by the producer)
+async def fetch_drone_data():
+    # Re-reading the zones file and rebuilding the index can take a second at 50k zones
+    await asyncio.to_thread(zone_registry.check_reload)
+    # Live mode only downloads the airspace around the configured restricted zones
+    with STAGE_SECONDS.labels("fetch").time():
+        snapshot = await data_source.fetch(zone_registry.index.bounds())
 
-    try:
-        logging.info("Attempting to send unauthorized drone alert email...")
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=5) as server:
-            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            server.send_message(msg)
-        logging.info(f"✅ Alert email sent for {callsign}")
-    except Exception as e:
-        logging.error(f"❌ Failed to send alert email: {e}")
+    # Parsing and geofencing are CPU-bound, so keep them off the event loop
+    return await asyncio.to_thread(process_flights, snapshot.states, snapshot.source)
 
-# ✅ Fetch Live Drone Data
-@app.get("/fetch-drones-live")
-def fetch_opensky_data():
+# ✅ Turn state vectors (raw rows or simulator columns) into the drone records and validation block of one cycle
+def process_flights(flights, source):
     global _data_source
-    try:
-        response = requests.get(OPENSKY_URL, timeout=10)
-        flights = response.json().get("states", []) if response.status_code == 200 else []
-        _data_source = "live"
-    except requests.exceptions.RequestException as e:
-        logging.error(f"❌ OpenSky API error: {str(e)}. Using simulated data.")
-        flights = []
-        _data_source = "simulation"
-
-    structured_flights = []
-
-    # 1) Generate a few new unauthorized drones in restricted zones
-    for i in range(random.randint(3, 7)):  # random 3-7
-        zone = random.choice(RESTRICTED_ZONES)
-        lat = zone["latitude"] + random.uniform(-0.05, 0.05)
-        lon = zone["longitude"] + random.uniform(-0.05, 0.05)
-        structured_flights.append({
-            "callsign": f"SIM-{i+1}",
-            "latitude": lat,
-            "longitude": lon,
-            "altitude": random.randint(500, 3000),
-            "velocity": random.uniform(50, 300),
-            "unauthorized": True,
-            "zone": zone["name"]
-        })
-
-    # 2) Generate random drones within a smaller bounding box to avoid ocean
-    # Central US bounding box: lat ~ 33..43, lon ~ -110..-80
-    for i in range(10):
-        lat = random.uniform(33.0, 43.0)
-        lon = random.uniform(-110.0, -80.0)
-        unauthorized, zone_name = is_unauthorized_flight(lat, lon)
-
-        structured_flights.append({
-            "callsign": f"SIM-{i+6}",
-            "latitude": lat,
-            "longitude": lon,
-            "altitude": random.randint(500, 3000),
-            "velocity": random.uniform(50, 300),
-            "unauthorized": unauthorized,
-            "zone": zone_name if unauthorized else "None"
-        })
+    if isinstance(flights, StateVectors):
+        states = flights
+    else:
+        with STAGE_SECONDS.labels("parse").time():
+            states = parse_states(flights)
+    _data_source = source
+    structured_flights = build_drone_records(states)
 
     # Log unauthorized drone count for debugging
     unauthorized_count = sum(1 for drone in structured_flights if drone["unauthorized"])
     logging.info(f"🔴 Unauthorized Drone Count Updated: {unauthorized_count}")
 
-    # ✅ Trigger email alerts for any unauthorized drones
-    for drone in structured_flights:
-        if drone["unauthorized"]:
-            zone = drone["zone"] if drone["zone"] != "None" else "Unknown"
-            send_alert_email(drone["callsign"], drone["latitude"], drone["longitude"], zone)
-
-    validation_result = validate_drone_counts(structured_flights)
+    with STAGE_SECONDS.labels("validate").time():
+        validation_result = validate_drone_counts(structured_flights)
     return {"drones": structured_flights, "validation": validation_result}
 
+# ✅ Encode one cycle for every channel that has subscribers (runs in a worker thread)
+def encode_cycle(payload, channels):
+    frames = {FULL_CHANNEL: json.dumps(payload)}
+    encodings = [encoding for encoding in ENCODERS if f"delta-{encoding}" in channels]
+    if not encodings:
+        # Nobody to diff for: skip the delta work and start from a snapshot when someone subscribes
+        delta_stream.reset()
+        return frames
+    message = delta_stream.update(payload)
+    for encoding in encodings:
+        frames[f"delta-{encoding}"] = ENCODERS[encoding](message)
+    return frames
+
+# ✅ Single producer: one fetch, one geofence pass and one serialization per cycle for all clients
+async def poll_drones():
+    global _cycle_id, _latest_payload, _latest_frame
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        try:
+            drones = await fetch_drone_data()
+            now = time.time()
+            with STAGE_SECONDS.labels("tracks").time():
+                zone_events = await loop.run_in_executor(None, track_store.update, drones["drones"], now)
+            # Log only what the configured source observed: not the simulated fallback, not a re-served stale snapshot
+            if observation_writer is not None and _data_source == data_source.name:
+                with STAGE_SECONDS.labels("persist").time():
+                    observation_writer.submit(drones["drones"], now)
+            # Alert when a drone enters a zone, not on every cycle it stays there
+            with STAGE_SECONDS.labels("alerting").time():
+                alert_dispatcher.submit([e for e in zone_events if e["type"] == ZONE_ENTER])
+            _cycle_id += 1
+            payload = {**drones, "zone_events": zone_events, "data_source": _data_source, "cycle_id": _cycle_id}
+            with STAGE_SECONDS.labels("serialize").time():
+                frames = await loop.run_in_executor(None, encode_cycle, payload, hub.channels())
+            _latest_payload, _latest_frame = payload, frames[FULL_CHANNEL]
+            hub.publish(frames)
+
+            metrics.CYCLES.labels(_data_source).inc()
+            metrics.CYCLE_SECONDS.observe(loop.time() - started)
+            metrics.AIRCRAFT.set(drones["validation"]["total_drones"])
+            metrics.UNAUTHORIZED.set(drones["validation"]["unauthorized"])
+            for channel, frame in frames.items():
+                metrics.WS_FRAME_BYTES.labels(channel).observe(len(frame))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.CYCLE_FAILURES.inc()
+            logging.error(f"❌ Polling cycle failed: {e}")
+        await asyncio.sleep(max(0.0, data_source.interval - (loop.time() - started)))
+
+# ✅ Latest cycle for REST clients (served from cache, never triggers a fetch)
+@app.get("/fetch-drones-live")
+def fetch_drones_live():
+    if _latest_payload is None:
+        return {"drones": [], "validation": validate_drone_counts([]), "data_source": _data_source, "cycle_id": _cycle_id}
+    return _latest_payload
+
 # ✅ WebSocket Streaming for Real-Time Data
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, protocol: str = FULL_CHANNEL, encoding: str = "json"):
+    """Full frames by default. With ``protocol=delta`` the client gets a snapshot, then one delta
+    per cycle whose ``base`` is the previous cycle_id. Deltas with a cycle_id the client already
+    has can be ignored; on any other gap the client sends ``{"type": "resync"}`` and receives
+    a fresh snapshot.
+    """
     await websocket.accept()
-    try:
+    if protocol == FULL_CHANNEL:
+        channel, initial_frame = FULL_CHANNEL, _latest_frame
+    elif protocol == "delta" and encoding in ENCODERS:
+        channel = f"delta-{encoding}"
+        initial_frame = delta_stream.snapshot_frame(encoding) if delta_stream.cycle_id is not None else None
+    else:
+        await websocket.close(code=1008)
+        return
+    subscriber = hub.subscribe(channel, initial_frame)
+
+    async def send_frames():
         while True:
-            global _cycle_id
-            # Run blocking fetch (includes SMTP) in a thread so it doesn't freeze the event loop
-            loop = asyncio.get_event_loop()
-            drones = await loop.run_in_executor(None, fetch_opensky_data)
-            _cycle_id += 1
-            payload = {**drones, "data_source": _data_source, "cycle_id": _cycle_id}
-            await websocket.send_text(json.dumps(payload))
-            await asyncio.sleep(10)
+            frame = await subscriber.get()
+            with STAGE_SECONDS.labels("ws_send").time():
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+
+    async def receive_commands():
+        while True:
+            message = await websocket.receive_text()
+            try:
+                command = json.loads(message)
+            except ValueError:
+                continue
+            if channel != FULL_CHANNEL and isinstance(command, dict) and command.get("type") == "resync":
+                if delta_stream.cycle_id is not None:
+                    subscriber.reset(delta_stream.snapshot_frame(encoding))
+
+    tasks = [asyncio.create_task(send_frames()), asyncio.create_task(receive_commands())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
     except WebSocketDisconnect:
         logging.info("⚠️ WebSocket Disconnected.")
     except Exception as e:
         logging.error(f"❌ WebSocket error: {e}")
     finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(subscriber)
         try:
             await websocket.close()
         except Exception:
             pass
 
+# ✅ Prometheus scrape endpoint: stage timings, cycle counters, client gauges and queue depths
+@app.get("/metrics")
+def get_metrics():
+    return Response(generate_latest(metrics.REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+# ✅ OpenSky client request, cache and rate-limit counters
+@app.get("/opensky/stats")
+def get_opensky_stats():
+    return {**opensky_client.stats(), "data_source": _data_source}
+
+# ✅ Alert queue depth, delivery and latency counters
+@app.get("/alerts/stats")
+def get_alert_stats():
+    return alert_dispatcher.stats()
+
+# ✅ Tracks currently held by the server, optionally limited to a bounding box
+@app.get("/tracks")
+def get_tracks(bbox: Optional[str] = None, limit: int = Query(1000, ge=1, le=50000)):
+    if bbox is None:
+        return {"tracks": track_store.query_bbox(-90, -180, 90, 180, limit=limit), **track_store.stats()}
+    try:
+        lamin, lomin, lamax, lomax = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be lamin,lomin,lamax,lomax")
+    return {"tracks": track_store.query_bbox(lamin, lomin, lamax, lomax, limit=limit), **track_store.stats()}
+
+# ✅ Recent history of one track (keyed by icao24, or callsign for simulated drones)
+@app.get("/tracks/{track_id}")
+def get_track(track_id: str):
+    track = track_store.get(track_id)
+    if track is None:
+        raise HTTPException(status_code=404, detail=f"No track for {track_id}")
+    return track
+
+# ✅ Historical queries over drone_logs (time window in epoch seconds, default: the last hour)
+def _history_backend():
+    if observation_writer is None:
+        raise HTTPException(status_code=503, detail="Persistence is disabled")
+    return observation_writer.backend
+
+def _time_window(start: Optional[float], end: Optional[float]):
+    end = time.time() if end is None else end
+    return (end - 3600 if start is None else start), end
+
+@app.get("/history/unauthorized")
+def get_unauthorized_summary(start: Optional[float] = None, end: Optional[float] = None):
+    start, end = _time_window(start, end)
+    rows = _history_backend().zone_counts(start, end)
+    return {"start": start, "end": end, "zones": [{"zone": z, "observations": n, "drones": d} for z, n, d in rows]}
+
+@app.get("/history/zones/{zone_name}")
+def get_zone_history(zone_name: str, start: Optional[float] = None, end: Optional[float] = None,
+                     limit: int = Query(1000, ge=1, le=100000)):
+    start, end = _time_window(start, end)
+    rows = _history_backend().zone_events(zone_name, start, end, limit)
+    return {
+        "zone": zone_name, "start": start, "end": end,
+        "events": [
+            {"drone_id": d, "callsign": c, "latitude": la, "longitude": lo, "altitude": a, "timestamp": t}
+            for d, c, la, lo, a, t in rows
+        ],
+    }
+
+@app.get("/history/drones/{drone_id}/path")
+def get_drone_path(drone_id: str, start: Optional[float] = None, end: Optional[float] = None,
+                   limit: int = Query(10000, ge=1, le=100000)):
+    start, end = _time_window(start, end)
+    rows = _history_backend().drone_path(drone_id, start, end, limit)
+    return {
+        "drone_id": drone_id, "start": start, "end": end,
+        "points": [
+            {"latitude": la, "longitude": lo, "altitude": a, "velocity": v, "is_authorized": bool(ok), "zone": z, "timestamp": t}
+            for la, lo, a, v, ok, z, t in rows
+        ],
+    }
+
+@app.get("/history/stats")
+def get_persistence_stats():
+    if observation_writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **observation_writer.stats()}
+
 # ✅ Get Restricted Zones
 @app.get("/restricted-zones")
-def get_restricted_zones():
-    return {"restricted_zones": RESTRICTED_ZONES}
+def get_restricted_zones(
+    lamin: Optional[float] = None,
+    lomin: Optional[float] = None,
+    lamax: Optional[float] = None,
+    lomax: Optional[float] = None,
+):
+    zone_registry.check_reload()
+    index = zone_registry.index
+    if None in (lamin, lomin, lamax, lomax):
+        return {"restricted_zones": index.zones}
+    return {"restricted_zones": index.query_bbox(lamin, lomin, lamax, lomax)}
 
 # ✅ Force a Test Drone
 @app.post("/force-drone")
-def force_custom_drone(latitude: float = Query(...), longitude: float = Query(...)):
-    unauthorized, zone_name = is_unauthorized_flight(latitude, longitude)
+def force_custom_drone(latitude: float = Query(...), longitude: float = Query(...), altitude: Optional[float] = None):
+    unauthorized, zone_name = is_unauthorized_flight(latitude, longitude, altitude)
     return {
         "callsign": "TEST-DRONE",
         "latitude": latitude,
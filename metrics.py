@@ -0,0 +1,40 @@
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+# ✅ Own registry so /metrics only shows pipeline metrics (and tests can import this freely)
+REGISTRY = CollectorRegistry()
+
+# Buckets from 0.1 ms to 10 s: geofencing a snapshot takes milliseconds, a slow fetch seconds
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+STAGE_SECONDS = Histogram(
+    "drone_pipeline_stage_seconds",
+    "Time spent in each stage of a polling cycle",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+    registry=REGISTRY,
+)
+CYCLE_SECONDS = Histogram(
+    "drone_pipeline_cycle_seconds",
+    "Wall time of a whole polling cycle",
+    buckets=STAGE_BUCKETS,
+    registry=REGISTRY,
+)
+CYCLES = Counter("drone_pipeline_cycles", "Completed polling cycles", ["data_source"], registry=REGISTRY)
+CYCLE_FAILURES = Counter("drone_pipeline_cycle_failures", "Polling cycles that raised", registry=REGISTRY)
+AIRCRAFT = Gauge("drone_pipeline_aircraft", "Aircraft in the latest cycle", registry=REGISTRY)
+UNAUTHORIZED = Gauge("drone_pipeline_unauthorized", "Unauthorized aircraft in the latest cycle", registry=REGISTRY)
+
+WS_CLIENTS = Gauge("drone_ws_clients", "Connected WebSocket clients", registry=REGISTRY)
+WS_FRAMES_DROPPED = Gauge("drone_ws_frames_dropped", "Frames dropped for slow WebSocket clients still connected", registry=REGISTRY)
+WS_FRAME_BYTES = Histogram(
+    "drone_ws_frame_bytes",
+    "Size of each encoded cycle frame per channel",
+    ["channel"],
+    buckets=(1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7),
+    registry=REGISTRY,
+)
+
+ALERT_QUEUE_DEPTH = Gauge("drone_alert_queue_depth", "Alerts waiting to be emailed", registry=REGISTRY)
+ALERT_SEND_SECONDS = Gauge("drone_alert_last_send_seconds", "Latency of the last alert email", registry=REGISTRY)
+PERSISTENCE_PENDING = Gauge("drone_logs_pending_rows", "Observations buffered for drone_logs", registry=REGISTRY)
+TRACKS = Gauge("drone_tracks", "Aircraft held in the track store", registry=REGISTRY)
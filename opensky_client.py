@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import httpx
+
+BBox = Tuple[float, float, float, float]
+
+
+class OpenSkyError(Exception):
+    """Raised when no snapshot (fresh or cached) can be returned."""
+
+
+class Snapshot(NamedTuple):
+    states: List[list]
+    time: Optional[int]
+    fetched_at: float
+    fresh: bool
+
+
+class OpenSkyClient:
+    """Pooled, rate-limit-aware client for OpenSky ``states/all``.
+
+    Responses are cached for ``cache_ttl`` seconds, counted from when the request was sent, and
+    concurrent callers inside that window share a single request. Keep it below the polling
+    interval so each cycle still gets a new snapshot. A 429 or a failed request starts a
+    backoff period using ``X-Rate-Limit-Retry-After-Seconds`` when present, doubling
+    otherwise. While backing off, the last good response for the same bbox is returned with
+    ``fresh=False``, but only until it is ``max_stale`` seconds old; after that the failure is raised.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        cache_ttl: float = 5.0,
+        timeout: float = 10.0,
+        backoff_base: float = 5.0,
+        max_backoff: float = 300.0,
+        max_stale: float = 60.0,
+    ):
+        self.url = url
+        self.auth = (username, password) if username and password else None
+        self.cache_ttl, self.timeout = cache_ttl, timeout
+        self.backoff_base, self.max_backoff = backoff_base, max_backoff
+        self.max_stale = max_stale
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._cache: Optional[Snapshot] = None
+        self._cache_bbox: Optional[BBox] = None
+        self._retry_at = 0.0
+        self._failures = 0
+
+        self.requests = 0
+        self.cache_hits = 0
+        self.stale_served = 0
+        self.rate_limited = 0
+        self.rate_limit_remaining: Optional[int] = None
+
+    def _session(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                auth=self.auth,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _back_off(self, retry_after: Optional[float] = None):
+        self._failures += 1
+        delay = retry_after if retry_after is not None else self.backoff_base * 2 ** (self._failures - 1)
+        self._retry_at = time.monotonic() + min(delay, self.max_backoff)
+
+    def _stale(self, reason: str, bbox: Optional[BBox]) -> Snapshot:
+        # Frozen positions from a long outage, or for a box the zones no longer cover, are worse than none
+        if self._cache is None or self._cache_bbox != bbox or time.monotonic() - self._cache.fetched_at > self.max_stale:
+            raise OpenSkyError(reason)
+        self.stale_served += 1
+        return self._cache._replace(fresh=False)
+
+    # ✅ One snapshot per data window, however many callers ask for it
+    async def fetch(self, bbox: Optional[BBox] = None) -> Snapshot:
+        async with self._lock:
+            now = time.monotonic()
+            if self._cache is not None and self._cache_bbox == bbox and now - self._cache.fetched_at < self.cache_ttl:
+                self.cache_hits += 1
+                return self._cache
+            if now < self._retry_at:
+                return self._stale(f"backing off for {self._retry_at - now:.0f}s", bbox)
+
+            params = dict(zip(("lamin", "lomin", "lamax", "lomax"), bbox)) if bbox else None
+            self.requests += 1
+            requested_at = now
+            try:
+                response = await self._session().get(self.url, params=params)
+            except httpx.HTTPError as e:
+                logging.error(f"❌ OpenSky API error: {e}")
+                self._back_off()
+                return self._stale(str(e), bbox)
+
+            remaining = response.headers.get("X-Rate-Limit-Remaining")
+            if remaining is not None and remaining.lstrip("-").isdigit():
+                self.rate_limit_remaining = int(remaining)
+            if response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = response.headers.get("X-Rate-Limit-Retry-After-Seconds") or response.headers.get("Retry-After")
+                self._back_off(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                logging.warning(f"⚠️ OpenSky rate limit hit; backing off for {self._retry_at - time.monotonic():.0f}s")
+                return self._stale("rate limited", bbox)
+            if response.status_code != 200:
+                logging.error(f"❌ OpenSky API returned HTTP {response.status_code}")
+                self._back_off()
+                return self._stale(f"HTTP {response.status_code}", bbox)
+
+            try:
+                body = response.json()
+            except ValueError as e:
+                self._back_off()
+                return self._stale(f"invalid JSON: {e}", bbox)
+            self._failures = 0
+            self._cache = Snapshot(body.get("states") or [], body.get("time"), requested_at, True)
+            self._cache_bbox = bbox
+            return self._cache
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "stale_served": self.stale_served,
+            "rate_limited": self.rate_limited,
+            "rate_limit_remaining": self.rate_limit_remaining,
+            "backoff_remaining": max(0.0, self._retry_at - time.monotonic()),
+        }
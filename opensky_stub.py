@@ -0,0 +1,87 @@
+"""Local stand-in for the OpenSky ``states/all`` endpoint.
+
+Replays recorded responses (a JSON-lines file, one ``states/all`` body per line) in a loop,
+applying the lamin/lomin/lamax/lomax filter like the real API. ``--limit`` answers with 429
+and rate-limit headers once that many requests have been served.
+
+    python opensky_stub.py recordings/states.jsonl --port 8081
+    OPENSKY_URL=http://127.0.0.1:8081/api/states/all uvicorn main:app
+"""
+import argparse
+import gzip
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def load_recording(path):
+    with (gzip.open(path, "rt") if path.endswith(".gz") else open(path)) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def filter_bbox(body, query):
+    try:
+        lamin, lomin, lamax, lomax = (float(query[k][0]) for k in ("lamin", "lomin", "lamax", "lomax"))
+    except (KeyError, ValueError):
+        return body
+    states = [
+        s for s in body.get("states") or []
+        if s[6] is not None and s[5] is not None and lamin <= s[6] <= lamax and lomin <= s[5] <= lomax
+    ]
+    return {**body, "states": states}
+
+
+def make_server(snapshots, host="127.0.0.1", port=8081, limit=None, retry_after=60):
+    frames = itertools.cycle(snapshots)
+    lock = threading.Lock()
+    served = {"count": 0, "queries": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/api/states/all":
+                self.send_error(404)
+                return
+            query = parse_qs(url.query)
+            with lock:
+                served["count"] += 1
+                served["queries"].append(query)
+                count = served["count"]
+                body = next(frames)
+            remaining = None if limit is None else max(limit - count, 0)
+            if limit is not None and count > limit:
+                self.send_response(429)
+                self.send_header("X-Rate-Limit-Retry-After-Seconds", str(retry_after))
+                self.end_headers()
+                return
+            data = json.dumps(filter_bbox(body, query)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if remaining is not None:
+                self.send_header("X-Rate-Limit-Remaining", str(remaining))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.served = served
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="JSON-lines file of recorded states/all responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--limit", type=int, help="answer 429 after this many requests")
+    parser.add_argument("--retry-after", type=int, default=60)
+    args = parser.parse_args()
+
+    server = make_server(load_recording(args.recording), args.host, args.port, args.limit, args.retry_after)
+    print(f"🛰️ Replaying {args.recording} at http://{args.host}:{args.port}/api/states/all")
+    server.serve_forever()
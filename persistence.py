@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+COLUMNS = ("drone_id", "callsign", "latitude", "longitude", "altitude", "velocity", "is_authorized", "zone", "timestamp")
+
+
+def observation_rows(drones: List[dict], timestamp: float) -> List[tuple]:
+    """Flatten one cycle's drone records into drone_logs rows."""
+    return [
+        (
+            d.get("icao24") or d["callsign"], d["callsign"], d["latitude"], d["longitude"],
+            d.get("altitude"), d.get("velocity"), not d["unauthorized"],
+            d["zone"] if d["unauthorized"] else None, timestamp,
+        )
+        for d in drones
+    ]
+
+
+class SQLiteBackend:
+    """drone_logs in a local SQLite file: the stand-in for PostGIS in development and tests."""
+
+    def __init__(self, path: str = "drone_logs.db"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS drone_logs ("
+                " id INTEGER PRIMARY KEY, drone_id TEXT, callsign TEXT,"
+                " latitude REAL, longitude REAL, altitude REAL, velocity REAL,"
+                " is_authorized BOOLEAN, zone TEXT, timestamp REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_drone_logs_drone_time ON drone_logs (drone_id, timestamp)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_drone_logs_zone_time ON drone_logs (zone, timestamp) WHERE NOT is_authorized"
+            )
+
+    def write_rows(self, rows: List[tuple]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO drone_logs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows
+            )
+
+    def prune(self, before: float) -> int:
+        # Rows are appended in time order, so everything older than ``before`` sits below one id
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM drone_logs WHERE id < COALESCE("
+                " (SELECT id FROM drone_logs WHERE timestamp >= ? ORDER BY id LIMIT 1),"
+                " (SELECT MAX(id) + 1 FROM drone_logs))",
+                (before,),
+            ).rowcount
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def zone_events(self, zone: str, start: float, end: float, limit: int) -> List[tuple]:
+        return self._query(
+            "SELECT drone_id, callsign, latitude, longitude, altitude, timestamp FROM drone_logs"
+            " WHERE NOT is_authorized AND zone = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp LIMIT ?",
+            (zone, start, end, limit),
+        )
+
+    def zone_counts(self, start: float, end: float) -> List[tuple]:
+        return self._query(
+            "SELECT zone, COUNT(*), COUNT(DISTINCT drone_id) FROM drone_logs"
+            " WHERE NOT is_authorized AND timestamp BETWEEN ? AND ? GROUP BY zone ORDER BY COUNT(*) DESC",
+            (start, end),
+        )
+
+    def drone_path(self, drone_id: str, start: float, end: float, limit: int) -> List[tuple]:
+        return self._query(
+            "SELECT latitude, longitude, altitude, velocity, is_authorized, zone, timestamp FROM drone_logs"
+            " WHERE drone_id = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp LIMIT ?",
+            (drone_id, start, end, limit),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresBackend:
+    """drone_logs in PostgreSQL, bulk-loaded with COPY. Needs the optional ``psycopg`` package."""
+
+    def __init__(self, dsn: str):
+        try:
+            import psycopg
+        except ImportError as e:
+            raise RuntimeError("PostgreSQL persistence needs psycopg: pip install 'psycopg[binary]'") from e
+        self._conn = psycopg.connect(dsn)
+        self._lock = threading.Lock()
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS drone_logs ("
+                " id SERIAL PRIMARY KEY, drone_id TEXT, callsign TEXT,"
+                " latitude DOUBLE PRECISION, longitude DOUBLE PRECISION, altitude DOUBLE PRECISION,"
+                " velocity DOUBLE PRECISION, is_authorized BOOLEAN, zone TEXT,"
+                " timestamp TIMESTAMP DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'UTC'))"
+            )
+            for column, ddl in (("callsign", "TEXT"), ("velocity", "DOUBLE PRECISION"), ("zone", "TEXT")):
+                cur.execute(f"ALTER TABLE drone_logs ADD COLUMN IF NOT EXISTS {column} {ddl}")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_drone_logs_drone_time ON drone_logs (drone_id, timestamp)")
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_drone_logs_zone_time ON drone_logs (zone, timestamp) WHERE NOT is_authorized"
+            )
+            self._conn.commit()
+
+    def write_rows(self, rows: List[tuple]):
+        with self._lock, self._conn.cursor() as cur:
+            with cur.copy(f"COPY drone_logs ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row[:-1] + (datetime.fromtimestamp(row[-1], tz=timezone.utc).replace(tzinfo=None),))
+            self._conn.commit()
+
+    def prune(self, before: float) -> int:
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM drone_logs WHERE id < COALESCE("
+                " (SELECT id FROM drone_logs WHERE timestamp >= (to_timestamp(%s) AT TIME ZONE 'UTC') ORDER BY id LIMIT 1),"
+                " (SELECT MAX(id) + 1 FROM drone_logs))",
+                (before,),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            self._conn.commit()
+            return rows
+
+    def zone_events(self, zone: str, start: float, end: float, limit: int) -> List[tuple]:
+        return self._query(
+            "SELECT drone_id, callsign, latitude, longitude, altitude, EXTRACT(EPOCH FROM timestamp)::float8 FROM drone_logs"
+            " WHERE NOT is_authorized AND zone = %s AND timestamp BETWEEN (to_timestamp(%s) AT TIME ZONE 'UTC') AND (to_timestamp(%s) AT TIME ZONE 'UTC')"
+            " ORDER BY timestamp LIMIT %s",
+            (zone, start, end, limit),
+        )
+
+    def zone_counts(self, start: float, end: float) -> List[tuple]:
+        return self._query(
+            "SELECT zone, COUNT(*), COUNT(DISTINCT drone_id) FROM drone_logs"
+            " WHERE NOT is_authorized AND timestamp BETWEEN (to_timestamp(%s) AT TIME ZONE 'UTC') AND (to_timestamp(%s) AT TIME ZONE 'UTC')"
+            " GROUP BY zone ORDER BY COUNT(*) DESC",
+            (start, end),
+        )
+
+    def drone_path(self, drone_id: str, start: float, end: float, limit: int) -> List[tuple]:
+        return self._query(
+            "SELECT latitude, longitude, altitude, velocity, is_authorized, zone, EXTRACT(EPOCH FROM timestamp)::float8 FROM drone_logs"
+            " WHERE drone_id = %s AND timestamp BETWEEN (to_timestamp(%s) AT TIME ZONE 'UTC') AND (to_timestamp(%s) AT TIME ZONE 'UTC')"
+            " ORDER BY timestamp LIMIT %s",
+            (drone_id, start, end, limit),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ObservationWriter:
+    """Write-behind buffer in front of a drone_logs backend.
+
+    ``submit`` appends a cycle's rows in memory and returns immediately. A worker task flushes
+    the buffer in one bulk write (in a thread) once ``flush_rows`` rows are waiting or
+    ``flush_interval`` seconds have passed. If the database falls behind, at most
+    ``max_pending_rows`` rows are held; beyond that the oldest rows are dropped and counted.
+    With ``retention`` set, rows older than that many seconds are deleted every
+    ``prune_interval`` seconds.
+    """
+
+    def __init__(self, backend, flush_rows: int = 50_000, flush_interval: float = 5.0,
+                 max_pending_rows: int = 500_000, backoff_base: float = 1.0, max_backoff: float = 60.0,
+                 retention: Optional[float] = None, prune_interval: float = 3600.0):
+        self.backend = backend
+        self.flush_rows, self.flush_interval = flush_rows, flush_interval
+        self.max_pending_rows = max_pending_rows
+        self.backoff_base, self.max_backoff = backoff_base, max_backoff
+        self.retention, self.prune_interval = retention, prune_interval
+        self._last_prune: Optional[float] = None
+
+        self._buffer: List[tuple] = []
+        self._flush_needed: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_seconds = 0.0
+        self.rows_pruned = 0
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._buffer)
+
+    def start(self):
+        self._flush_needed = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        # Last chance to persist what is still buffered
+        if self._buffer:
+            try:
+                await self._flush()
+            except Exception as e:
+                logging.error(f"❌ Final drone_logs flush failed: {e}")
+        await asyncio.to_thread(self.backend.close)
+
+    # ✅ Called once per cycle from the producer: buffer only, never touches the database
+    def submit(self, drones: List[dict], timestamp: Optional[float] = None):
+        self._buffer.extend(observation_rows(drones, time.time() if timestamp is None else timestamp))
+        self._enforce_cap()
+        if self._flush_needed is not None and len(self._buffer) >= self.flush_rows:
+            self._flush_needed.set()
+
+    def _enforce_cap(self):
+        overflow = len(self._buffer) - self.max_pending_rows
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.rows_dropped += overflow
+            logging.warning(f"⚠️ drone_logs writer is behind; dropped {overflow} oldest rows")
+
+    async def _flush(self):
+        rows, self._buffer = self._buffer, []
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.backend.write_rows, rows)
+        except Exception:
+            # Put the batch back in front of anything buffered meanwhile, still under the cap
+            self._buffer[:0] = rows
+            self._enforce_cap()
+            raise
+        self.last_flush_seconds = time.perf_counter() - started
+        self.rows_written += len(rows)
+        self.flushes += 1
+
+    async def _run(self):
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            if not self._buffer:
+                continue
+            try:
+                await self._flush()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                self.failed_flushes += 1
+                delay = min(self.backoff_base * 2 ** (failures - 1), self.max_backoff)
+                logging.error(f"❌ drone_logs flush failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self._prune()
+            except Exception as e:
+                logging.error(f"❌ drone_logs prune failed: {e}")
+
+    async def _prune(self):
+        if not self.retention or (self._last_prune is not None and time.monotonic() - self._last_prune < self.prune_interval):
+            return
+        self._last_prune = time.monotonic()
+        pruned = await asyncio.to_thread(self.backend.prune, time.time() - self.retention)
+        self.rows_pruned += pruned
+        if pruned:
+            logging.info(f"✅ Pruned {pruned} drone_logs rows older than {self.retention / 3600:g}h")
+
+    def stats(self) -> dict:
+        return {
+            "pending_rows": self.pending_rows,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_seconds": self.last_flush_seconds,
+            "rows_pruned": self.rows_pruned,
+        }
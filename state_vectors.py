@@ -0,0 +1,73 @@
+import math
+from typing import List, NamedTuple
+
+import numpy as np
+
+# ✅ Column positions inside an OpenSky `states/all` state vector
+ICAO24 = 0
+CALLSIGN = 1
+LAST_CONTACT = 4
+LONGITUDE = 5
+LATITUDE = 6
+BARO_ALTITUDE = 7
+ON_GROUND = 8
+VELOCITY = 9
+TRUE_TRACK = 10
+VERTICAL_RATE = 11
+GEO_ALTITUDE = 13
+
+
+class StateVectors(NamedTuple):
+    """Columnar view of one OpenSky snapshot: one NumPy array per field, one row per aircraft."""
+    icao24: np.ndarray
+    callsign: np.ndarray
+    last_contact: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    baro_altitude: np.ndarray
+    geo_altitude: np.ndarray
+    velocity: np.ndarray
+    heading: np.ndarray
+    vertical_rate: np.ndarray
+    on_ground: np.ndarray
+
+    def __len__(self):
+        return len(self.icao24)
+
+    @property
+    def altitude(self):
+        # Prefer barometric altitude, fall back to GPS altitude when the transponder omits it
+        return np.where(np.isnan(self.baro_altitude), self.geo_altitude, self.baro_altitude)
+
+    def take(self, index):
+        """Select rows by boolean mask or integer index, returning a new StateVectors."""
+        return StateVectors(*(column[index] for column in self))
+
+
+def _float_column(column, count):
+    return np.fromiter((math.nan if v is None else v for v in column), dtype=np.float64, count=count)
+
+
+def empty_states() -> StateVectors:
+    return parse_states([])
+
+
+# ✅ Parse the raw `states` list into columnar arrays, dropping rows without a position fix
+def parse_states(states: List[list]) -> StateVectors:
+    rows = [s for s in states or [] if s[LATITUDE] is not None and s[LONGITUDE] is not None]
+    count = len(rows)
+    columns = list(zip(*rows)) if rows else [()] * (GEO_ALTITUDE + 1)
+
+    return StateVectors(
+        icao24=np.array(columns[ICAO24], dtype=str) if count else np.empty(0, dtype=str),
+        callsign=np.array([(c or "").strip() for c in columns[CALLSIGN]], dtype=str) if count else np.empty(0, dtype=str),
+        last_contact=_float_column(columns[LAST_CONTACT], count),
+        latitude=_float_column(columns[LATITUDE], count),
+        longitude=_float_column(columns[LONGITUDE], count),
+        baro_altitude=_float_column(columns[BARO_ALTITUDE], count),
+        geo_altitude=_float_column(columns[GEO_ALTITUDE], count),
+        velocity=_float_column(columns[VELOCITY], count),
+        heading=_float_column(columns[TRUE_TRACK], count),
+        vertical_rate=_float_column(columns[VERTICAL_RATE], count),
+        on_ground=np.fromiter((bool(v) for v in columns[ON_GROUND]), dtype=bool, count=count),
+    )
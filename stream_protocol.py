@@ -0,0 +1,242 @@
+import json
+import struct
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ✅ Quantization: 1e-5 deg (~1 m) positions, whole metres, 0.1 m/s and 0.01 deg headings
+COORD_SCALE = 100_000
+VELOCITY_SCALE = 10
+TRACK_SCALE = 100
+
+FLAG_UNAUTHORIZED = 1
+FLAG_ON_GROUND = 2
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+# Per-entity values after the key: callsign is only sent when an entity is added
+ENTITY_FIELDS = ["key", "callsign", "lat", "lon", "alt", "vel", "track", "flags", "zone"]
+MOVED_FIELDS = ["key", "lat", "lon", "alt", "vel", "track", "flags", "zone"]
+
+# Binary layout: header, JSON meta block, then added / moved / removed sections
+BINARY_MAGIC = b"DRN1"
+BINARY_HEADER = struct.Struct("<4sBII")
+BINARY_LENGTH = struct.Struct("<I")
+RECORD_DTYPE = np.dtype([
+    ("lat", "<i4"), ("lon", "<i4"), ("alt", "<i4"),
+    ("vel", "<u2"), ("track", "<u2"), ("flags", "u1"), ("zone", "<u2"),
+])
+NO_ZONE = 0xFFFF
+NO_BASE = 0xFFFFFFFF
+
+
+def entity_key(drone: dict) -> str:
+    return drone.get("icao24") or drone["callsign"]
+
+
+def quantize(drone: dict) -> tuple:
+    """Reduce a drone record to the integer tuple that is diffed and sent on the wire."""
+    flags = (FLAG_UNAUTHORIZED if drone["unauthorized"] else 0) | (FLAG_ON_GROUND if drone.get("on_ground") else 0)
+    zone = drone["zone"] if drone["unauthorized"] else None
+    return (
+        round(drone["latitude"] * COORD_SCALE),
+        round(drone["longitude"] * COORD_SCALE),
+        round(drone.get("altitude") or 0),
+        min(round((drone.get("velocity") or 0) * VELOCITY_SCALE), 0xFFFF),
+        round(((drone.get("true_track") or 0) % 360) * TRACK_SCALE),
+        flags,
+        zone,
+    )
+
+
+class DeltaStream:
+    """Tracks the last published entity table and turns each cycle into a snapshot or delta.
+
+    Messages are plain dicts so the same cycle can be encoded as JSON or binary. A delta's
+    ``base`` is the cycle it applies to; a client whose last cycle differs must resync. The
+    first cycle after construction or ``reset`` has nothing to diff against and is a snapshot.
+    ``update`` runs on the producer's worker thread while snapshots are served from the event
+    loop, so the published state is swapped and read under a lock.
+    """
+
+    def __init__(self):
+        self.cycle_id: Optional[int] = None
+        self.entities: Dict[str, tuple] = {}
+        self.callsigns: Dict[str, str] = {}
+        self.meta: dict = {}
+        self._snapshot_frames: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def update(self, payload: dict) -> dict:
+        entities, callsigns = {}, {}
+        for drone in payload["drones"]:
+            key = entity_key(drone)
+            entities[key] = quantize(drone)
+            callsigns[key] = drone["callsign"]
+
+        previous, previous_callsigns = self.entities, self.callsigns
+        added, moved = [], []
+        for key, record in entities.items():
+            old = previous.get(key)
+            if old is None or previous_callsigns[key] != callsigns[key]:
+                added.append((key, callsigns[key], record))
+            elif old != record:
+                moved.append((key, record))
+        removed = [key for key in previous if key not in entities]
+
+        message = {
+            "type": DELTA if self.cycle_id is not None else SNAPSHOT,
+            "cycle_id": payload["cycle_id"],
+            "base": self.cycle_id,
+            "meta": {
+                "data_source": payload["data_source"],
+                "validation": payload["validation"],
+                "zone_events": payload.get("zone_events", []),
+            },
+            "added": added,
+            "moved": moved,
+            "removed": removed,
+        }
+        with self._lock:
+            self.cycle_id, self.entities, self.callsigns = payload["cycle_id"], entities, callsigns
+            self.meta = message["meta"]
+            self._snapshot_frames = {}
+        return message
+
+    def reset(self):
+        """Drop the published table, e.g. while nobody is subscribed to the delta stream."""
+        with self._lock:
+            self.cycle_id, self.entities, self.callsigns, self.meta = None, {}, {}, {}
+            self._snapshot_frames = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "type": SNAPSHOT,
+            "cycle_id": self.cycle_id,
+            "base": None,
+            "meta": self.meta,
+            "added": [(key, self.callsigns[key], record) for key, record in self.entities.items()],
+            "moved": [],
+            "removed": [],
+        }
+
+    def snapshot_frame(self, encoding: str):
+        """Encoded snapshot of the current cycle, built once per cycle per encoding."""
+        with self._lock:
+            if encoding not in self._snapshot_frames:
+                self._snapshot_frames[encoding] = ENCODERS[encoding](self.snapshot())
+            return self._snapshot_frames[encoding]
+
+
+# ✅ JSON encoding: compact arrays instead of one object per drone
+def encode_json(message: dict) -> str:
+    body = {
+        "type": message["type"],
+        "cycle_id": message["cycle_id"],
+        "base": message["base"],
+        **message["meta"],
+        "added": [[key, callsign, *record] for key, callsign, record in message["added"]],
+        "moved": [[key, *record] for key, record in message["moved"]],
+        "removed": message["removed"],
+    }
+    if message["type"] == SNAPSHOT:
+        body["fields"] = ENTITY_FIELDS
+        body["moved_fields"] = MOVED_FIELDS
+        body["scale"] = {"coord": COORD_SCALE, "vel": VELOCITY_SCALE, "track": TRACK_SCALE}
+    return json.dumps(body, separators=(",", ":"))
+
+
+def _pack_strings(strings: List[str]) -> bytes:
+    data = "\n".join(strings).encode()
+    return BINARY_LENGTH.pack(len(data)) + data
+
+
+def _pack_records(records: List[tuple], zones: Dict[str, int]) -> bytes:
+    array = np.empty(len(records), dtype=RECORD_DTYPE)
+    if records:
+        lat, lon, alt, vel, track, flags, zone = zip(*records)
+        array["lat"], array["lon"], array["alt"] = lat, lon, alt
+        array["vel"], array["track"], array["flags"] = vel, track, flags
+        array["zone"] = [NO_ZONE if z is None else zones.setdefault(z, len(zones)) for z in zone]
+    return array.tobytes()
+
+
+# ✅ Binary encoding: packed little-endian record arrays plus newline-joined string tables
+def encode_binary(message: dict) -> bytes:
+    zones: Dict[str, int] = {}
+    added = _pack_records([record for _, _, record in message["added"]], zones)
+    moved = _pack_records([record for _, record in message["moved"]], zones)
+    meta = json.dumps({**message["meta"], "zones": list(zones)}, separators=(",", ":")).encode()
+
+    kind = 0 if message["type"] == SNAPSHOT else 1
+    base = NO_BASE if message["base"] is None else message["base"]
+    return b"".join([
+        BINARY_HEADER.pack(BINARY_MAGIC, kind, message["cycle_id"], base),
+        BINARY_LENGTH.pack(len(meta)), meta,
+        BINARY_LENGTH.pack(len(message["added"])),
+        _pack_strings([key for key, _, _ in message["added"]]),
+        _pack_strings([callsign for _, callsign, _ in message["added"]]),
+        added,
+        BINARY_LENGTH.pack(len(message["moved"])),
+        _pack_strings([key for key, _ in message["moved"]]),
+        moved,
+        BINARY_LENGTH.pack(len(message["removed"])),
+        _pack_strings(message["removed"]),
+    ])
+
+
+def decode_binary(frame: bytes) -> dict:
+    """Inverse of encode_binary, for Python clients and for checking the format."""
+    magic, kind, cycle_id, base = BINARY_HEADER.unpack_from(frame, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a drone stream frame")
+    offset = BINARY_HEADER.size
+
+    def read_length():
+        nonlocal offset
+        (value,) = BINARY_LENGTH.unpack_from(frame, offset)
+        offset += BINARY_LENGTH.size
+        return value
+
+    def read_strings(count):
+        nonlocal offset
+        size = read_length()
+        data = frame[offset:offset + size].decode()
+        offset += size
+        return data.split("\n") if count else []
+
+    def read_records(count):
+        nonlocal offset
+        array = np.frombuffer(frame, dtype=RECORD_DTYPE, count=count, offset=offset)
+        offset += array.nbytes
+        return [
+            (lat, lon, alt, vel, track, flags, None if zone == NO_ZONE else zones[zone])
+            for lat, lon, alt, vel, track, flags, zone in array.tolist()
+        ]
+
+    meta_size = read_length()
+    meta = json.loads(frame[offset:offset + meta_size])
+    offset += meta_size
+    zones = meta.pop("zones")
+
+    count = read_length()
+    keys, callsigns = read_strings(count), read_strings(count)
+    added = list(zip(keys, callsigns, read_records(count)))
+    count = read_length()
+    moved = list(zip(read_strings(count), read_records(count)))
+    removed = read_strings(read_length())
+
+    return {
+        "type": SNAPSHOT if kind == 0 else DELTA,
+        "cycle_id": cycle_id,
+        "base": None if base == NO_BASE else base,
+        "meta": meta,
+        "added": added,
+        "moved": moved,
+        "removed": removed,
+    }
+
+
+ENCODERS = {"json": encode_json, "binary": encode_binary}
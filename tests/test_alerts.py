@@ -0,0 +1,161 @@
+"""AlertDispatcher against a local SMTP stand-in (aiosmtpd), so no real email is sent."""
+import asyncio
+import email
+from email import policy
+import socket
+
+import pytest
+
+from alerts import AlertDispatcher
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(email.message_from_bytes(envelope.content, policy=policy.default))
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def smtp_server(port):
+    inbox = Inbox()
+    controller = aiosmtpd_controller.Controller(inbox, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, inbox
+
+
+def dispatcher(port, **kwargs):
+    options = {"use_ssl": False, "batch_window": 0.2, "backoff_base": 0.05, "timeout": 2, **kwargs}
+    return AlertDispatcher("127.0.0.1", port, "alerts@test.local", "ops@test.local", **options)
+
+
+def intrusion(icao24, zone="JFK Airport"):
+    return {"icao24": icao24, "callsign": f"CS{icao24}", "latitude": 40.64, "longitude": -73.77, "zone": zone}
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timed out waiting for the dispatcher")
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+def server():
+    port = free_port()
+    controller, inbox = smtp_server(port)
+    yield port, inbox
+    controller.stop()
+
+
+def test_cooldown_suppresses_repeats_per_drone_and_zone(server):
+    port, inbox = server
+
+    async def run():
+        d = dispatcher(port, cooldown=300)
+        d.start()
+        try:
+            assert d.submit([intrusion("a")], now=1000) == 1
+            assert d.submit([intrusion("a")], now=1100) == 0
+            # Same drone, different zone: its own cooldown
+            assert d.submit([intrusion("a", zone="Pentagon")], now=1100) == 1
+            # Cooldown over
+            assert d.submit([intrusion("a")], now=1301) == 1
+            await wait_for(lambda: d.sent_alerts == 3)
+        finally:
+            await d.stop()
+        return d
+
+    d = asyncio.run(run())
+    assert (d.submitted, d.suppressed) == (3, 1)
+
+
+def test_alerts_in_one_window_become_one_digest(server):
+    port, inbox = server
+
+    async def run():
+        d = dispatcher(port)
+        d.start()
+        try:
+            d.submit([intrusion("a"), intrusion("b"), intrusion("c")])
+            await wait_for(lambda: d.sent_alerts == 3)
+            d.submit([intrusion("d")])
+            await wait_for(lambda: d.sent_alerts == 4)
+        finally:
+            await d.stop()
+        return d
+
+    d = asyncio.run(run())
+    assert d.sent_messages == 2
+    assert [m["Subject"] for m in inbox.messages] == ["🚨 3 Unauthorized Drone Alerts", "🚨 Unauthorized Drone Alert"]
+    digest = inbox.messages[0].get_body().get_content()
+    assert all(f"CS{k}" in digest for k in "abc")
+
+
+def test_reconnects_with_backoff_after_session_drop():
+    port = free_port()
+    controller, first_inbox = smtp_server(port)
+
+    async def run():
+        d = dispatcher(port)
+        d.start()
+        try:
+            d.submit([intrusion("a")])
+            await wait_for(lambda: d.sent_messages == 1)
+            # The server goes away and comes back: the kept-alive session is now dead
+            await asyncio.to_thread(controller.stop)
+            second, second_inbox = await asyncio.to_thread(smtp_server, port)
+            try:
+                d.submit([intrusion("b")])
+                await wait_for(lambda: d.sent_messages == 2)
+            finally:
+                await asyncio.to_thread(second.stop)
+        finally:
+            await d.stop()
+        return d, second_inbox
+
+    d, second_inbox = asyncio.run(run())
+    assert len(first_inbox.messages) == 1 and len(second_inbox.messages) == 1
+    assert d.retries >= 1 and d.failed_alerts == 0
+
+
+def test_gives_up_after_max_retries():
+    port = free_port()  # nothing listening
+
+    async def run():
+        d = dispatcher(port, max_retries=2)
+        d.start()
+        try:
+            d.submit([intrusion("a"), intrusion("b")])
+            await wait_for(lambda: d.failed_alerts == 2)
+        finally:
+            await d.stop()
+        return d
+
+    d = asyncio.run(run())
+    assert (d.retries, d.sent_messages) == (2, 0)
+
+
+def test_stop_cancels_a_worker_collecting_a_batch():
+    async def run():
+        d = dispatcher(free_port(), batch_window=5)
+        d.start()
+        d.submit([intrusion("a")])
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)  # the worker has the first alert and is waiting for more
+        # Cancel in the same loop tick that the next alert arrives
+        d.submit([intrusion("b")])
+        stopped, _ = await asyncio.wait({asyncio.ensure_future(d.stop())}, timeout=2)
+        return stopped
+
+    assert asyncio.run(run()), "stop() hung waiting for the worker"
@@ -0,0 +1,126 @@
+import asyncio
+import gzip
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from data_sources import ReplaySource, TrafficSimulator
+from geofence import haversine_np
+from zones import RESTRICTED_ZONES, ZoneIndex
+
+
+@pytest.mark.parametrize("speed", [0, -1, float("nan")])
+def test_sources_reject_a_non_positive_speed(tmp_path, speed):
+    with pytest.raises(ValueError, match="speed"):
+        TrafficSimulator(RESTRICTED_ZONES, 10, speed=speed)
+    with pytest.raises(ValueError, match="speed"):
+        ReplaySource(str(tmp_path / "replay.jsonl"), speed=speed)
+
+
+def test_record_cli_does_not_import_the_app(tmp_path):
+    output = tmp_path / "sim.jsonl"
+    script = (
+        "import runpy, sys; sys.argv = ['data_sources.py', 'record', sys.argv[1], '--aircraft', '50', '--cycles', '2'];"
+        "runpy.run_path('data_sources.py', run_name='__main__'); assert 'main' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", script, str(output)], check=True, capture_output=True,
+                   cwd=Path(__file__).resolve().parent.parent)
+    assert len(output.read_text().splitlines()) == 2
+
+
+def test_same_seed_same_traffic():
+    a, b = (TrafficSimulator(RESTRICTED_ZONES, 500, seed=7, start_time=0) for _ in range(2))
+    other = TrafficSimulator(RESTRICTED_ZONES, 500, seed=8, start_time=0)
+    for _ in range(3):
+        for simulator in (a, b, other):
+            simulator.advance()
+    first, second = a.snapshot(), b.snapshot()
+    assert all(np.array_equal(x, y) for x, y in zip(first, second))
+    assert not np.array_equal(first.latitude, other.snapshot().latitude)
+
+
+def test_aircraft_move_consistently_between_steps():
+    simulator = TrafficSimulator(RESTRICTED_ZONES, 2_000, seed=1, intrusion_rate=0.1, step_seconds=10, start_time=0)
+    before = simulator.snapshot()
+    simulator.advance()
+    after = simulator.snapshot()
+    assert simulator.time == 10
+    assert np.array_equal(before.icao24, after.icao24)
+
+    # Each aircraft covers about velocity * step (bounces at the area edge and turns shorten it a little)
+    moved_km = haversine_np(before.latitude, before.longitude, after.latitude, after.longitude)
+    expected_km = after.velocity * 10 / 1000
+    cruising = np.char.startswith(after.callsign, "SIM")
+    ratio = moved_km[cruising] / expected_km[cruising]
+    assert np.median(ratio) == pytest.approx(1.0, abs=0.01) and ratio.max() < 1.01
+    # Drones fly their orbit at their own speed: the chord is never longer than the arc
+    drone_ratio = moved_km[~cruising] / expected_km[~cruising]
+    assert drone_ratio.max() < 1.01 and np.median(drone_ratio) > 0.5
+
+
+def test_intrusion_rate_holds():
+    index = ZoneIndex(RESTRICTED_ZONES)
+    simulator = TrafficSimulator(RESTRICTED_ZONES, 10_000, seed=3, intrusion_rate=0.05)
+    intruders = np.char.startswith(simulator.callsign, "UAV")
+    assert intruders.sum() == 500
+
+    for _ in range(5):
+        simulator.advance()
+        states = simulator.snapshot()
+        inside = index.lookup(states.latitude, states.longitude, states.altitude) >= 0
+        # Drone orbits cross the zone edge, so most, not all, of them are inside at any moment;
+        # cruising traffic only rarely passes through a zone
+        assert 0.5 < inside[intruders].mean() < 0.9
+        assert inside[~intruders].sum() < 10
+        assert 0.025 < inside.mean() < 0.05
+
+
+def test_speed_shortens_the_simulated_interval():
+    assert TrafficSimulator(RESTRICTED_ZONES, 10, step_seconds=10, speed=5).interval == 2.0
+
+
+def write_recording(path, times):
+    with (gzip.open(path, "wt") if str(path).endswith(".gz") else open(path, "w")) as f:
+        for t in times:
+            f.write(json.dumps({"time": t, "states": [[f"{t:06x}"]]}) + "\n")
+
+
+def replay(source, cycles):
+    async def run():
+        out = []
+        for _ in range(cycles):
+            snapshot = await source.fetch()
+            out.append((snapshot.states[0][0] if snapshot.states else None, source.interval))
+        await source.close()
+        return out
+
+    return asyncio.run(run())
+
+
+def test_replay_waits_the_gap_to_the_next_snapshot(tmp_path):
+    path = tmp_path / "uneven.jsonl"
+    write_recording(path, [0, 10, 40, 50])
+    played = replay(ReplaySource(str(path), speed=2, loop=False, default_gap=10), 5)
+    # After t=0 the next is 10 s away, after t=10 it is 30 s away, ...; halved by speed=2
+    assert played == [("000000", 5.0), ("00000a", 15.0), ("000028", 5.0), ("000032", 5.0), (None, 5.0)]
+
+
+def test_replay_loops_and_speeds_up(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    write_recording(path, [100, 120])
+    source = ReplaySource(str(path), speed=4, default_gap=8)
+    played = replay(source, 5)
+    assert [key for key, _ in played] == ["000064", "000078", "000064", "000078", "000064"]
+    # 20 s recorded gaps at 4x; the jump back to the start uses the default gap
+    assert [interval for _, interval in played] == [5.0, 2.0, 5.0, 2.0, 5.0]
+    assert (source.loops, source.replayed) == (2, 5)
+
+
+def test_replay_of_an_empty_file_does_not_spin(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_text("\n")
+    assert replay(ReplaySource(str(path)), 2) == [(None, 10.0), (None, 10.0)]
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from geofence import find_zones, haversine_np
+
+ZONES = [
+    {"name": "JFK Airport", "latitude": 40.6413, "longitude": -73.7781, "radius": 10},
+    {"name": "Wide", "latitude": 40.6413, "longitude": -73.7781, "radius": 50},
+]
+
+
+def test_haversine_known_distances():
+    # One degree of latitude on the 6371 km sphere, and JFK to LAX
+    assert haversine_np(0, 0, 1, 0) == pytest.approx(111.195, abs=1e-3)
+    assert haversine_np(40.6413, -73.7781, 33.9416, -118.4085) == pytest.approx(3974.2, abs=1.0)
+    assert haversine_np(10, 20, 10, 20) == 0
+
+
+def test_haversine_broadcasts():
+    distance = haversine_np(np.zeros((3, 1)), np.zeros((3, 1)), np.array([0.0, 1.0]), np.zeros(2))
+    assert distance.shape == (3, 2)
+    assert distance[:, 1] == pytest.approx([111.195] * 3, abs=1e-3)
+
+
+def test_find_zones_returns_first_containing_zone():
+    lat = [40.6413, 40.9, 41.5, 0.0]
+    lon = [-73.7781, -73.7781, -73.7781, 0.0]
+    # Inside both, inside only the wide zone (~29 km away), and outside both
+    assert find_zones(lat, lon, ZONES).tolist() == [0, 1, -1, -1]
+
+
+def test_find_zones_edge_cases():
+    assert find_zones([1.0, 2.0], [1.0, 2.0], []).tolist() == [-1, -1]
+    assert find_zones([], [], ZONES).tolist() == []
+    assert find_zones(40.6413, -73.7781, ZONES).tolist() == [0]
@@ -0,0 +1,72 @@
+import asyncio
+
+from hub import BroadcastHub, Subscriber
+
+
+def drain(subscriber):
+    frames = []
+    while not subscriber.queue.empty():
+        frames.append(subscriber.queue.get_nowait())
+    return frames
+
+
+def test_full_queue_drops_the_oldest_frame():
+    subscriber = Subscriber(maxsize=3, channel="full")
+    for frame in range(5):
+        subscriber.push(frame)
+    assert subscriber.dropped == 2
+    assert drain(subscriber) == [2, 3, 4]
+
+
+def test_reset_replaces_queued_frames():
+    subscriber = Subscriber(maxsize=3, channel="delta-json")
+    for frame in ("a", "b", "c"):
+        subscriber.push(frame)
+    subscriber.reset("snapshot")
+    assert drain(subscriber) == ["snapshot"] and subscriber.dropped == 0
+
+
+def test_subscribe_queues_the_initial_frame():
+    hub = BroadcastHub()
+    assert drain(hub.subscribe("full", initial_frame="current")) == ["current"]
+    assert drain(hub.subscribe("full")) == []
+
+
+def test_publish_filters_by_channel_and_shares_one_frame():
+    hub = BroadcastHub()
+    full = [hub.subscribe("full") for _ in range(3)]
+    binary = hub.subscribe("delta-binary")
+    idle = hub.subscribe("delta-json")
+    assert hub.channels() == {"full", "delta-binary", "delta-json"}
+
+    frames = {"full": '{"cycle_id": 1}', "delta-binary": b"\x01\x02"}
+    hub.publish(frames)
+    received = [drain(s) for s in full]
+    # Every client on a channel gets the very same object, encoded once
+    assert all(len(r) == 1 and r[0] is frames["full"] for r in received)
+    assert drain(binary)[0] is frames["delta-binary"]
+    assert drain(idle) == []
+
+
+def test_slow_client_does_not_hold_back_the_others():
+    hub = BroadcastHub(queue_size=2)
+    slow, fast = hub.subscribe("full"), hub.subscribe("full")
+
+    async def run():
+        received = []
+        for cycle in range(5):
+            hub.publish({"full": cycle})
+            received.append(await fast.get())
+        return received
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert (slow.dropped, fast.dropped) == (3, 0)
+    assert drain(slow) == [3, 4]
+
+
+def test_unsubscribe_stops_delivery():
+    hub = BroadcastHub()
+    subscriber = hub.subscribe("full")
+    hub.unsubscribe(subscriber)
+    hub.publish({"full": "frame"})
+    assert drain(subscriber) == [] and hub.channels() == set()
@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+
+import main
+from state_vectors import parse_states
+from stream_protocol import DELTA, SNAPSHOT, decode_binary
+
+
+def cycle_payload(cycle_id, lat=40.0):
+    drones = [{
+        "icao24": "abc123", "callsign": "TEST1", "latitude": lat, "longitude": -73.0, "altitude": 1000.0,
+        "velocity": 200.0, "true_track": 90.0, "on_ground": False, "unauthorized": False, "zone": "None",
+    }]
+    return {"drones": drones, "validation": main.validate_drone_counts(drones), "zone_events": [],
+            "data_source": "simulation", "cycle_id": cycle_id}
+
+
+def test_encode_cycle_skips_delta_state_without_delta_subscribers():
+    main.delta_stream.reset()
+    frames = main.encode_cycle(cycle_payload(1), {main.FULL_CHANNEL})
+    assert set(frames) == {main.FULL_CHANNEL}
+    assert json.loads(frames[main.FULL_CHANNEL])["cycle_id"] == 1
+    assert main.delta_stream.cycle_id is None
+
+    # The first cycle with a delta subscriber carries a full snapshot, later ones diff against it
+    frames = main.encode_cycle(cycle_payload(2), {main.FULL_CHANNEL, "delta-binary"})
+    assert decode_binary(frames["delta-binary"])["type"] == SNAPSHOT
+    frames = main.encode_cycle(cycle_payload(3, lat=40.1), {main.FULL_CHANNEL, "delta-binary"})
+    message = decode_binary(frames["delta-binary"])
+    assert (message["type"], message["base"], len(message["moved"])) == (DELTA, 2, 1)
+
+    # Last delta subscriber gone: the table is dropped again
+    main.encode_cycle(cycle_payload(4), {main.FULL_CHANNEL})
+    assert main.delta_stream.cycle_id is None and main.delta_stream.entities == {}
+
+
+def run_one_cycle(monkeypatch, tmp_path):
+    import sqlite3
+    import time
+    from fastapi.testclient import TestClient
+
+    db = tmp_path / "drone_logs.db"
+    monkeypatch.setenv("PERSISTENCE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(db))
+    monkeypatch.setattr(main.alert_dispatcher, "sender", None)
+    start = main._cycle_id
+    with TestClient(main.app):
+        deadline = time.monotonic() + 10
+        while main._cycle_id == start and time.monotonic() < deadline:
+            time.sleep(0.05)
+    assert main._cycle_id > start
+    with sqlite3.connect(db) as conn:
+        return conn.execute("SELECT COUNT(*) FROM drone_logs").fetchone()[0]
+
+
+def test_simulated_fallback_cycles_are_not_persisted(monkeypatch, tmp_path):
+    # OpenSky unreachable: the live source falls back to its simulated fleet
+    monkeypatch.setattr(main.opensky_client, "url", "http://127.0.0.1:9/api/states/all")
+    monkeypatch.setattr(main.opensky_client, "_retry_at", 0.0)
+    monkeypatch.setattr(main, "data_source", main.LiveSource(main.opensky_client, fallback=main.TrafficSimulator(main.RESTRICTED_ZONES, 20)))
+    assert run_one_cycle(monkeypatch, tmp_path) == 0
+    assert main._data_source == "simulation"
+
+
+def test_configured_simulator_cycles_are_persisted(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "data_source", main.TrafficSimulator(main.RESTRICTED_ZONES, 50))
+    assert run_one_cycle(monkeypatch, tmp_path) == 50
+
+
+def raw_row(icao24, lat, lon, baro=1000.0, geo=1100.0, callsign="TEST1"):
+    return [icao24, callsign, "US", 0, 0, lon, lat, baro, False, 200.0, 90.0, 0.0, None, geo, None, False, 0]
+
+
+def test_build_drone_records_geofences_and_fills_gaps():
+    states = parse_states([
+        raw_row("inside", 40.6413, -73.7781),
+        raw_row("outside", 10.0, 10.0, baro=None, callsign=None),
+        raw_row("nofix", None, None),
+    ])
+    inside, outside = main.build_drone_records(states)
+    assert (inside["unauthorized"], inside["zone"], inside["altitude"]) == (True, "JFK Airport", 1000.0)
+    assert (outside["unauthorized"], outside["zone"]) == (False, "None")
+    # No callsign: the icao24 stands in; no barometric altitude: the GPS one is used
+    assert (outside["callsign"], outside["altitude"]) == ("outside", 1100.0)
+
+
+def test_scalar_wrapper_agrees_with_the_batch_pass():
+    rng = np.random.default_rng(0)
+    zones = main.zone_registry.index.zones
+    # Points scattered around every zone, so both hits and misses are common
+    lat = np.concatenate([z["latitude"] + rng.uniform(-0.2, 0.2, 50) for z in zones])
+    lon = np.concatenate([z["longitude"] + rng.uniform(-0.2, 0.2, 50) for z in zones])
+    records = main.build_drone_records(parse_states([raw_row(f"{i:06x}", a, o) for i, (a, o) in enumerate(zip(lat, lon))]))
+    assert any(r["unauthorized"] for r in records) and not all(r["unauthorized"] for r in records)
+    for record in records:
+        flagged, zone = main.is_unauthorized_flight(record["latitude"], record["longitude"], record["altitude"])
+        assert (flagged, zone or "None") == (record["unauthorized"], record["zone"])
+
+
+def test_persistence_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.delenv("PERSISTENCE", raising=False)
+    monkeypatch.setenv("DB_HOST", "db.example")
+    assert main.make_persistence_backend() is None
+
+    # Asked for PostgreSQL without a host: off, never a surprise SQLite file
+    monkeypatch.setenv("PERSISTENCE", "postgres")
+    monkeypatch.delenv("DB_HOST")
+    monkeypatch.chdir(tmp_path)
+    assert main.make_persistence_backend() is None
+    assert not (tmp_path / "drone_logs.db").exists()
+
+    monkeypatch.setenv("PERSISTENCE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "logs.db"))
+    backend = main.make_persistence_backend()
+    assert isinstance(backend, main.SQLiteBackend)
+    backend.close()
@@ -0,0 +1,189 @@
+import asyncio
+import gzip
+import json
+import threading
+
+import httpx
+import pytest
+
+import main
+import opensky_client
+from data_sources import LiveSource, TrafficSimulator
+from opensky_client import OpenSkyClient, OpenSkyError
+from opensky_stub import load_recording, make_server
+
+BODY = {"time": 1_700_000_000, "states": [["abc123", "TEST1", "US", 0, 0, -73.0, 40.0, 1000.0, False, 200.0, 90.0, 0.0, None, 1000.0, None, False, 0]]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(opensky_client.time, "monotonic", fake.monotonic)
+    return fake
+
+
+def client_with(handler, **kwargs):
+    client = OpenSkyClient("http://opensky.test/api/states/all", **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_every_polling_cycle_makes_a_fresh_request(clock):
+    latency = 0.8
+
+    def handler(request):
+        clock.now += latency  # the response arrives a little after the request went out
+        return httpx.Response(200, json=BODY)
+
+    client = client_with(handler, cache_ttl=main.opensky_client.cache_ttl)
+
+    async def run():
+        snapshots = []
+        cycle_start = clock.now
+        for _ in range(6):
+            clock.now = cycle_start  # the producer starts a cycle every POLL_INTERVAL
+            snapshots.append(await client.fetch(main.zone_registry.index.bounds()))
+            cycle_start += main.POLL_INTERVAL
+        await client.close()
+        return snapshots
+
+    snapshots = asyncio.run(run())
+    assert (client.requests, client.cache_hits) == (6, 0)
+    assert all(s.fresh for s in snapshots)
+
+
+def test_callers_inside_one_window_share_a_request(clock):
+    client = client_with(lambda request: httpx.Response(200, json=BODY), cache_ttl=5)
+
+    async def run():
+        first = await client.fetch()
+        clock.now += 4
+        second = await client.fetch()
+        clock.now += 1
+        third = await client.fetch()
+        await client.close()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert second is first and third is not first
+    assert (client.requests, client.cache_hits) == (2, 1)
+
+
+def test_rate_limit_backs_off_and_serves_the_last_snapshot(clock):
+    responses = iter([
+        httpx.Response(200, json=BODY),
+        httpx.Response(429, headers={"X-Rate-Limit-Retry-After-Seconds": "60"}),
+    ])
+    client = client_with(lambda request: next(responses), cache_ttl=5)
+
+    async def run():
+        await client.fetch()
+        clock.now += 10
+        limited = await client.fetch()
+        clock.now += 30
+        backing_off = await client.fetch()
+        await client.close()
+        return limited, backing_off
+
+    limited, backing_off = asyncio.run(run())
+    assert not limited.fresh and not backing_off.fresh
+    assert (client.requests, client.rate_limited, client.stale_served) == (2, 1, 2)
+
+
+def test_stale_snapshot_expires_after_max_stale(clock):
+    responses = iter([httpx.Response(200, json=BODY)] + [httpx.Response(503)] * 5)
+    client = client_with(lambda request: next(responses), cache_ttl=5, backoff_base=1, max_stale=60)
+
+    async def run():
+        await client.fetch()
+        clock.now += 30
+        stale = await client.fetch()
+        clock.now += 31
+        try:
+            with pytest.raises(OpenSkyError):
+                await client.fetch()
+        finally:
+            await client.close()
+        return stale
+
+    assert not asyncio.run(run()).fresh
+
+
+def test_stale_snapshot_is_only_served_for_the_same_bbox(clock):
+    responses = iter([httpx.Response(200, json=BODY), httpx.Response(503)])
+    client = client_with(lambda request: next(responses), cache_ttl=5)
+
+    async def run():
+        await client.fetch((39.0, -74.0, 41.0, -72.0))
+        clock.now += 10
+        try:
+            # The zones were reloaded: the old box's aircraft are not a stand-in for the new one
+            with pytest.raises(OpenSkyError):
+                await client.fetch((30.0, -90.0, 35.0, -80.0))
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_live_source_falls_back_once_the_cache_is_too_old(clock):
+    responses = iter([httpx.Response(200, json=BODY)] + [httpx.Response(503)] * 5)
+    client = client_with(lambda request: next(responses), cache_ttl=5, backoff_base=1, max_stale=60)
+    source = LiveSource(client, fallback=TrafficSimulator([], 5))
+
+    async def run():
+        sources = [(await source.fetch()).source]
+        clock.now += 30
+        sources.append((await source.fetch()).source)
+        clock.now += 31
+        sources.append((await source.fetch()).source)
+        await source.close()
+        return sources
+
+    assert asyncio.run(run()) == ["live", "stale-cached", "simulation"]
+
+
+# ✅ Against the replaying stub server over real HTTP
+def stub_row(icao24, lat, lon):
+    return [icao24, f"CS{icao24}", "US", 0, 0, lon, lat, 1000.0, False, 200.0, 90.0, 0.0, None, 1000.0, None, False, 0]
+
+
+@pytest.fixture
+def stub(tmp_path):
+    path = tmp_path / "states.jsonl.gz"
+    body = {"time": 1_700_000_000, "states": [stub_row("inside", 40.0, -73.0), stub_row("outside", 10.0, 10.0)]}
+    with gzip.open(path, "wt") as f:
+        f.write(json.dumps(body) + "\n")
+    server = make_server(load_recording(str(path)), port=0, limit=2, retry_after=60)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def test_stub_filters_by_bbox_and_rate_limits(stub):
+    client = OpenSkyClient(f"http://127.0.0.1:{stub.server_port}/api/states/all", cache_ttl=0)
+    bbox = (39.0, -74.0, 41.0, -72.0)
+
+    async def run():
+        first = await client.fetch(bbox)
+        remaining_after_first = client.rate_limit_remaining
+        second = await client.fetch(bbox)
+        limited = await client.fetch(bbox)
+        await client.close()
+        return first, remaining_after_first, second, limited
+
+    first, remaining_after_first, second, limited = asyncio.run(run())
+    assert [s[0] for s in first.states] == ["inside"] and first.fresh
+    assert stub.served["queries"][0] == {"lamin": ["39.0"], "lomin": ["-74.0"], "lamax": ["41.0"], "lomax": ["-72.0"]}
+    assert (remaining_after_first, client.rate_limit_remaining) == (1, 0)
+    assert second.fresh and not limited.fresh and limited.states == first.states
+    assert (client.requests, client.rate_limited, stub.served["count"]) == (3, 1, 3)
+    assert client.stats()["backoff_remaining"] > 50
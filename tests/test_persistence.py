@@ -0,0 +1,55 @@
+from persistence import ObservationWriter, SQLiteBackend, observation_rows
+
+
+def drone(icao24, zone=None, lat=40.0):
+    return {"icao24": icao24, "callsign": f"CS{icao24}", "latitude": lat, "longitude": -73.0,
+            "altitude": 500.0, "velocity": 20.0, "unauthorized": zone is not None, "zone": zone or "None"}
+
+
+def test_history_queries(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "logs.db"))
+    backend.write_rows(observation_rows([drone("a", "JFK Airport"), drone("b")], 100.0))
+    backend.write_rows(observation_rows([drone("a", "JFK Airport", lat=40.1), drone("c", "Pentagon")], 110.0))
+
+    assert [row[0] for row in backend.zone_events("JFK Airport", 0, 200, 10)] == ["a", "a"]
+    assert backend.zone_counts(0, 200) == [("JFK Airport", 2, 1), ("Pentagon", 1, 1)]
+    assert [(row[0], row[-1]) for row in backend.drone_path("a", 105, 200, 10)] == [(40.1, 110.0)]
+    backend.close()
+
+
+def test_prune_drops_only_rows_older_than_the_cutoff(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "logs.db"))
+    for ts in (100.0, 200.0, 300.0):
+        backend.write_rows(observation_rows([drone("a"), drone("b")], ts))
+    assert backend.prune(250.0) == 4
+    assert [row[-1] for row in backend.drone_path("a", 0, 1000, 10)] == [300.0]
+    # Everything is older than the cutoff
+    assert backend.prune(1000.0) == 2
+    assert backend.prune(1000.0) == 0
+    backend.close()
+
+
+def test_writer_prunes_after_flush_when_retention_is_set(tmp_path):
+    import asyncio
+    import time
+
+    backend = SQLiteBackend(str(tmp_path / "logs.db"))
+    backend.write_rows(observation_rows([drone("old")], time.time() - 7200))
+
+    async def run():
+        writer = ObservationWriter(backend, flush_rows=1, retention=3600)
+        writer.start()
+        writer.submit([drone("new")])
+        deadline = time.monotonic() + 5
+        while writer.rows_pruned == 0 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        stats = writer.stats()
+        await writer.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["rows_pruned"] == 1
+    reopened = SQLiteBackend(str(tmp_path / "logs.db"))
+    assert reopened.drone_path("old", 0, time.time(), 10) == []
+    assert len(reopened.drone_path("new", 0, time.time() + 1, 10)) == 1
+    reopened.close()
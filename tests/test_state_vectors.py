@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+
+from state_vectors import parse_states
+
+
+def row(icao24, lat=40.0, lon=-73.0, baro=1000.0, geo=1100.0, callsign="TEST1  ", on_ground=False):
+    return [icao24, callsign, "US", 0, 1_700_000_000, lon, lat, baro, on_ground, 200.0, 90.0, -1.5, None, geo, None, False, 0]
+
+
+def test_rows_without_a_position_fix_are_dropped():
+    states = parse_states([row("a"), row("b", lat=None), row("c", lon=None), row("d")])
+    assert states.icao24.tolist() == ["a", "d"]
+    assert len(states) == 2
+
+
+def test_columns_and_callsign_handling():
+    states = parse_states([row("a"), row("b", callsign=None, on_ground=True)])
+    assert states.callsign.tolist() == ["TEST1", ""]
+    assert states.on_ground.tolist() == [False, True]
+    assert states.latitude.tolist() == [40.0, 40.0] and states.longitude.tolist() == [-73.0, -73.0]
+    assert states.vertical_rate.tolist() == [-1.5, -1.5] and states.last_contact[0] == 1_700_000_000
+
+
+def test_altitude_falls_back_from_baro_to_geo():
+    states = parse_states([row("a"), row("b", baro=None), row("c", baro=None, geo=None)])
+    altitude = states.altitude
+    assert altitude[:2].tolist() == [1000.0, 1100.0]
+    assert math.isnan(altitude[2])
+
+
+def test_empty_and_missing_snapshots():
+    for raw in ([], None, [row("a", lat=None)]):
+        states = parse_states(raw)
+        assert len(states) == 0 and states.latitude.dtype == np.float64
+
+
+def test_take_selects_rows():
+    states = parse_states([row("a"), row("b"), row("c")])
+    assert states.take(np.array([2, 0])).icao24.tolist() == ["c", "a"]
+    assert states.take(states.icao24 != "b").icao24.tolist() == ["a", "c"]
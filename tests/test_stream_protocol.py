@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from stream_protocol import DELTA, SNAPSHOT, DeltaStream, decode_binary, encode_binary, encode_json
+
+
+def drone(icao24, lat, lon, callsign=None, unauthorized=False):
+    return {
+        "icao24": icao24, "callsign": callsign or f"CS{icao24}", "latitude": lat, "longitude": lon,
+        "altitude": 1200.4, "velocity": 210.25, "true_track": 271.5, "on_ground": False,
+        "unauthorized": unauthorized, "zone": "JFK Airport" if unauthorized else "None",
+    }
+
+
+def payload(cycle_id, drones):
+    validation = {"total_drones": len(drones), "authorized": len(drones), "unauthorized": 0, "validation_passed": True}
+    return {"drones": drones, "validation": validation, "data_source": "simulation", "cycle_id": cycle_id}
+
+
+CYCLES = [
+    [drone("a", 40.0, -73.0), drone("b", 41.0, -74.0), drone("c", 40.64, -73.77, unauthorized=True)],
+    # a moves, b is unchanged, c leaves the zone, d joins
+    [drone("a", 40.01, -73.01), drone("b", 41.0, -74.0), drone("c", 40.8, -73.5), drone("d", 39.0, -75.0)],
+    # b drops out, d changes callsign, a is unchanged
+    [drone("a", 40.01, -73.01), drone("c", 40.8, -73.5), drone("d", 39.0, -75.0, callsign="NEW")],
+]
+
+
+def decode_json(frame):
+    body = json.loads(frame)
+    return {
+        "type": body["type"], "cycle_id": body["cycle_id"], "base": body["base"],
+        "added": [(row[0], row[1], tuple(row[2:])) for row in body["added"]],
+        "moved": [(row[0], tuple(row[1:])) for row in body["moved"]],
+        "removed": body["removed"],
+    }
+
+
+def apply(client, message):
+    """Reference client: returns the new (cycle_id, table) after applying one message."""
+    cycle_id, table = client
+    if message["type"] == SNAPSHOT:
+        table = {}
+    else:
+        assert message["base"] == cycle_id, "delta applied to the wrong base"
+        table = dict(table)
+    for key, callsign, record in message["added"]:
+        table[key] = (callsign, record)
+    for key, record in message["moved"]:
+        table[key] = (table[key][0], record)
+    for key in message["removed"]:
+        del table[key]
+    return message["cycle_id"], table
+
+
+def server_table(stream):
+    return {key: (stream.callsigns[key], record) for key, record in stream.entities.items()}
+
+
+def test_binary_round_trip():
+    stream = DeltaStream()
+    for cycle_id, drones in enumerate(CYCLES, start=1):
+        message = stream.update(payload(cycle_id, drones))
+        for original in (message, stream.snapshot()):
+            decoded = decode_binary(encode_binary(original))
+            assert decoded == original
+
+
+def test_binary_round_trip_empty():
+    message = DeltaStream().update(payload(1, []))
+    assert decode_binary(encode_binary(message)) == message
+
+
+def test_decode_binary_rejects_other_frames():
+    with pytest.raises(ValueError):
+        decode_binary(b"XXXX" + bytes(16))
+
+
+@pytest.mark.parametrize("encode, decode", [(encode_binary, decode_binary), (encode_json, decode_json)], ids=["binary", "json"])
+def test_deltas_rebuild_server_table(encode, decode):
+    stream = DeltaStream()
+    client = (None, {})
+    for cycle_id, drones in enumerate(CYCLES, start=1):
+        client = apply(client, decode(encode(stream.update(payload(cycle_id, drones)))))
+        assert client == (cycle_id, server_table(stream))
+
+
+def test_delta_contents():
+    stream = DeltaStream()
+    first = stream.update(payload(1, CYCLES[0]))
+    second = stream.update(payload(2, CYCLES[1]))
+    third = stream.update(payload(3, CYCLES[2]))
+
+    assert first["type"] == SNAPSHOT and first["base"] is None
+    assert second["type"] == DELTA and second["base"] == 1
+    assert [key for key, _, _ in second["added"]] == ["d"]
+    assert sorted(key for key, _ in second["moved"]) == ["a", "c"]
+    assert third["removed"] == ["b"]
+    # A changed callsign is re-sent as an add so clients pick up the new label
+    assert [(key, callsign) for key, callsign, _ in third["added"]] == [("d", "NEW")]
+
+
+def test_late_joiner_snapshot_matches_replayed_deltas():
+    stream = DeltaStream()
+    early = (None, {})
+    for cycle_id, drones in enumerate(CYCLES, start=1):
+        early = apply(early, stream.update(payload(cycle_id, drones)))
+    late = apply((None, {}), decode_binary(stream.snapshot_frame("binary")))
+    assert late == early
+
+
+def test_reset_starts_over_with_a_snapshot():
+    stream = DeltaStream()
+    stream.update(payload(1, CYCLES[0]))
+    stream.reset()
+    assert stream.cycle_id is None and stream.entities == {}
+    message = stream.update(payload(2, CYCLES[1]))
+    assert message["type"] == SNAPSHOT
+    assert len(message["added"]) == len(CYCLES[1])
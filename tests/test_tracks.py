@@ -0,0 +1,103 @@
+from tracks import ZONE_ENTER, ZONE_EXIT, TrackStore
+
+
+def obs(icao24, lat=40.0, lon=-73.0, zone=None):
+    return {"icao24": icao24, "callsign": f"CS{icao24}", "latitude": lat, "longitude": lon,
+            "altitude": 1000.0, "velocity": 200.0, "unauthorized": zone is not None, "zone": zone or "None"}
+
+
+def kinds(events):
+    return [(e["type"], e["icao24"], e["zone"]) for e in events]
+
+
+def test_ring_buffer_keeps_last_points_oldest_first():
+    store = TrackStore(capacity=4, history=4)
+    for t in range(6):
+        store.update([obs("a", lat=40.0 + t)], now=float(t))
+    track = store.get("a")
+    assert [p["time"] for p in track["points"]] == [2.0, 3.0, 4.0, 5.0]
+    assert [p["latitude"] for p in track["points"]] == [42.0, 43.0, 44.0, 45.0]
+    assert track["latitude"] == 45.0 and track["last_seen"] == 5.0
+
+
+def test_short_track_returns_only_recorded_points():
+    store = TrackStore(capacity=4, history=8)
+    store.update([obs("a")], now=1.0)
+    store.update([obs("a")], now=2.0)
+    assert [p["time"] for p in store.get("a")["points"]] == [1.0, 2.0]
+    assert store.get("missing") is None
+
+
+def test_idle_tracks_are_evicted_with_a_zone_exit():
+    store = TrackStore(capacity=4, history=4, idle_timeout=30)
+    store.update([obs("a"), obs("b", zone="JFK Airport")], now=0.0)
+    events = store.update([obs("a")], now=40.0)
+    assert store.get("b") is None and len(store) == 1
+    assert store.evicted == 1
+    assert kinds(events) == [(ZONE_EXIT, "b", "JFK Airport")]
+
+
+def test_track_returning_after_a_gap_keeps_its_history():
+    store = TrackStore(capacity=4, history=4, idle_timeout=30)
+    store.update([obs("a", zone="JFK Airport")], now=0.0)
+    assert store.update([obs("a", zone="JFK Airport")], now=100.0) == []
+    assert [p["time"] for p in store.get("a")["points"]] == [0.0, 100.0]
+    assert store.evicted == 0
+
+
+def test_full_store_replaces_least_recently_seen_tracks():
+    store = TrackStore(capacity=20, history=4, idle_timeout=1_000)
+    for t in range(10):
+        store.update([obs(f"old{t}")], now=float(t))
+    assert len(store) == 10
+
+    newcomers = [obs(f"new{i}") for i in range(20)]
+    store.update(newcomers, now=20.0)
+    assert len(store) == 20
+    assert all(store.get(f"new{i}") is not None for i in range(20))
+    assert store.evicted == 10
+
+
+def test_eviction_picks_oldest_tracks_not_in_this_cycle():
+    store = TrackStore(capacity=3, history=4, idle_timeout=1_000)
+    store.update([obs("a")], now=0.0)
+    store.update([obs("b")], now=1.0)
+    store.update([obs("c")], now=2.0)
+    store.update([obs("a"), obs("d")], now=3.0)
+    # a is the oldest but was seen this cycle, so b makes room
+    assert store.get("b") is None
+    assert {"a", "c", "d"} == {k for k in ("a", "b", "c", "d") if store.get(k) is not None}
+
+
+def test_aircraft_beyond_capacity_are_skipped_not_swapped_in():
+    store = TrackStore(capacity=2, history=4)
+    store.update([obs("a"), obs("b")], now=0.0)
+    store.update([obs("a"), obs("b"), obs("c")], now=1.0)
+    assert store.get("a") is not None and store.get("b") is not None and store.get("c") is None
+    assert store.evicted == 0
+
+
+def test_zone_transitions_are_reported_once():
+    store = TrackStore(capacity=4, history=4)
+    assert store.update([obs("a")], now=0.0) == []
+    assert kinds(store.update([obs("a", zone="JFK Airport")], now=1.0)) == [(ZONE_ENTER, "a", "JFK Airport")]
+    assert store.update([obs("a", zone="JFK Airport")], now=2.0) == []
+    assert kinds(store.update([obs("a", zone="Pentagon")], now=3.0)) == [
+        (ZONE_EXIT, "a", "JFK Airport"), (ZONE_ENTER, "a", "Pentagon"),
+    ]
+    assert kinds(store.update([obs("a")], now=4.0)) == [(ZONE_EXIT, "a", "Pentagon")]
+
+
+def test_first_sighting_inside_a_zone_is_an_entry():
+    store = TrackStore(capacity=4, history=4)
+    events = store.update([obs("a", lat=40.64, lon=-73.77, zone="JFK Airport")], now=0.0)
+    assert kinds(events) == [(ZONE_ENTER, "a", "JFK Airport")]
+    assert abs(events[0]["latitude"] - 40.64) < 1e-4 and events[0]["time"] == 0.0
+
+
+def test_query_bbox_and_stats():
+    store = TrackStore(capacity=8, history=4)
+    store.update([obs("a", lat=40.0, lon=-73.0), obs("b", lat=10.0, lon=10.0)], now=0.0)
+    assert [t["icao24"] for t in store.query_bbox(39, -74, 41, -72)] == ["a"]
+    stats = store.stats()
+    assert (stats["active_tracks"], stats["capacity"], stats["evicted"]) == (2, 8, 0)
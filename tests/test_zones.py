@@ -0,0 +1,132 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from geofence import EARTH_RADIUS_KM, find_zones
+from zones import ZoneIndex, ZoneRegistry, normalize_zone
+
+# An L-shaped polygon: the notch at the top right is outside
+L_SHAPE = {"name": "L", "polygon": [[0, 0], [0, 2], [1, 2], [1, 1], [2, 1], [2, 0]]}
+
+
+def points_near_edges(zones, count, rng, spread=0.005):
+    """Random points within ``spread`` (relative) of a random zone's circle edge."""
+    z = rng.integers(0, len(zones), count)
+    lat0 = np.radians([zones[i]["latitude"] for i in z])
+    lon0 = np.radians([zones[i]["longitude"] for i in z])
+    radius = np.array([zones[i]["radius"] for i in z])
+    bearing = rng.uniform(0, 2 * np.pi, count)
+    d = radius * rng.uniform(1 - spread, 1 + spread, count) / EARTH_RADIUS_KM
+    lat = np.arcsin(np.sin(lat0) * np.cos(d) + np.cos(lat0) * np.sin(d) * np.cos(bearing))
+    lon = lon0 + np.arctan2(np.sin(bearing) * np.sin(d) * np.cos(lat0), np.cos(d) - np.sin(lat0) * np.sin(lat))
+    return np.degrees(lat), (np.degrees(lon) + 180) % 360 - 180
+
+
+def test_lookup_matches_brute_force_near_circle_edges():
+    rng = np.random.default_rng(1)
+    zones = [
+        {"name": f"z{i}", "latitude": float(rng.uniform(-80, 80)), "longitude": float(rng.uniform(-170, 170)),
+         "radius": float(rng.uniform(50, 500))}
+        for i in range(50)
+    ]
+    index = ZoneIndex(zones)
+    lat, lon = points_near_edges(zones, 100_000, rng, spread=0.002)
+    assert np.array_equal(index.lookup(lat, lon), find_zones(lat, lon, zones))
+
+    # And uniformly over the globe, mostly outside every zone
+    lat, lon = rng.uniform(-90, 90, 50_000), rng.uniform(-180, 180, 50_000)
+    assert np.array_equal(index.lookup(lat, lon), find_zones(lat, lon, zones))
+
+
+def test_circle_bbox_covers_the_circle():
+    for latitude in (0.0, 45.0, 70.0, 85.0):
+        zone = normalize_zone({"name": "c", "latitude": latitude, "longitude": 10.0, "radius": 500})
+        lat, lon = points_near_edges([zone], 10_000, np.random.default_rng(1), spread=0.0)
+        lamin, lomin, lamax, lomax = zone["bbox"]
+        assert ((lat >= lamin) & (lat <= lamax) & (lon >= lomin) & (lon <= lomax)).all()
+
+
+def test_polygon_ray_cast_handles_concave_shapes():
+    index = ZoneIndex([L_SHAPE])
+    lat = [0.5, 1.5, 0.5, 1.5, 3.0]
+    lon = [0.5, 0.5, 1.5, 1.5, 0.5]
+    assert index.lookup(lat, lon).tolist() == [0, 0, 0, -1, -1]
+    zone = index.zones[0]
+    assert zone["shape"] == "polygon" and zone["bbox"] == [0.0, 0.0, 2.0, 2.0]
+
+
+def test_first_zone_in_list_order_wins():
+    big = {"name": "big", "latitude": 0.0, "longitude": 0.0, "radius": 100}
+    small = {"name": "small", "latitude": 0.0, "longitude": 0.0, "radius": 10}
+    assert ZoneIndex([small, big]).lookup(0.0, 0.0).tolist() == [0]
+    assert ZoneIndex([big, small]).lookup(0.0, 0.0).tolist() == [0]
+
+
+def test_altitude_band():
+    index = ZoneIndex([{"name": "band", "latitude": 0.0, "longitude": 0.0, "radius": 10, "floor": 100, "ceiling": 500}])
+    altitude = [50.0, 100.0, 300.0, 500.0, 900.0, np.nan]
+    assert index.lookup([0.0] * 6, [0.0] * 6, altitude).tolist() == [-1, 0, 0, 0, -1, 0]
+    # Without altitudes the band is not applied
+    assert index.lookup([0.0], [0.0]).tolist() == [0]
+
+
+def test_zone_names_query_bbox_and_bounds():
+    index = ZoneIndex([
+        {"name": "a", "latitude": 10.0, "longitude": 10.0, "radius": 10},
+        {"name": "b", "latitude": -20.0, "longitude": 40.0, "radius": 10},
+    ])
+    assert index.zone_names(index.lookup([10.0, 0.0], [10.0, 0.0])).tolist() == ["a", "None"]
+    assert [z["name"] for z in index.query_bbox(5, 5, 15, 15)] == ["a"]
+    assert [z["name"] for z in index.query_bbox(-30, 0, 30, 50)] == ["a", "b"]
+    lamin, lomin, lamax, lomax = index.bounds(margin_deg=0)
+    assert lamin < -20 < 10 < lamax and lomin < 10 < 40 < lomax
+    assert ZoneIndex([]).bounds() is None
+    assert ZoneIndex([]).lookup([0.0], [0.0]).tolist() == [-1]
+
+
+def test_polygon_needs_three_vertices():
+    with pytest.raises(ValueError):
+        normalize_zone({"name": "bad", "polygon": [[0, 0], [1, 1]]})
+
+
+def write_zones(path, zones, mtime):
+    path.write_text(json.dumps(zones))
+    os.utime(path, (mtime, mtime))
+
+
+def test_registry_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "zones.json"
+    write_zones(path, [{"name": "a", "latitude": 0.0, "longitude": 0.0, "radius": 5}], mtime=1_000)
+    registry = ZoneRegistry(str(path), [], poll_interval=0)
+    assert [z["name"] for z in registry.index.zones] == ["a"]
+
+    # Unchanged mtime: nothing to do
+    assert not registry.check_reload()
+
+    write_zones(path, {"restricted_zones": [{"name": "b", "latitude": 1.0, "longitude": 1.0, "radius": 5}]}, mtime=2_000)
+    assert registry.check_reload()
+    assert [z["name"] for z in registry.index.zones] == ["b"]
+
+
+def test_registry_keeps_the_previous_index_when_the_file_is_broken(tmp_path):
+    path = tmp_path / "zones.json"
+    write_zones(path, [{"name": "a", "latitude": 0.0, "longitude": 0.0, "radius": 5}], mtime=1_000)
+    registry = ZoneRegistry(str(path), [], poll_interval=0)
+    index = registry.index
+
+    path.write_text("[{not json")
+    os.utime(path, (2_000, 2_000))
+    assert not registry.check_reload()
+    assert registry.index is index
+
+    write_zones(path, [{"name": "no radius", "latitude": 0.0, "longitude": 0.0}], mtime=3_000)
+    assert not registry.check_reload()
+    assert registry.index is index
+
+
+def test_registry_without_a_file_uses_the_defaults(tmp_path):
+    defaults = [{"name": "d", "latitude": 0.0, "longitude": 0.0, "radius": 5}]
+    assert [z["name"] for z in ZoneRegistry(None, defaults).index.zones] == ["d"]
+    assert [z["name"] for z in ZoneRegistry(str(tmp_path / "missing.json"), defaults).index.zones] == ["d"]
@@ -0,0 +1,171 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ZONE_ENTER = "ZONE_ENTER"
+ZONE_EXIT = "ZONE_EXIT"
+
+
+class TrackStore:
+    """Recent history for every tracked aircraft, held in preallocated NumPy ring buffers.
+
+    Each track owns one row (slot) in a set of ``(capacity, history)`` arrays, so memory is
+    fixed at construction no matter how many aircraft come and go. Tracks unseen for
+    ``idle_timeout`` seconds are evicted, and when every slot is taken the least recently
+    seen track makes room. The store also remembers which zone each track was last in and
+    reports ZONE_ENTER / ZONE_EXIT transitions instead of re-flagging every cycle.
+    """
+
+    def __init__(self, capacity: int = 50_000, history: int = 32, idle_timeout: float = 300.0):
+        self.capacity, self.history, self.idle_timeout = capacity, history, idle_timeout
+        self._time = np.zeros((capacity, history), dtype=np.float64)
+        self._lat = np.zeros((capacity, history), dtype=np.float32)
+        self._lon = np.zeros((capacity, history), dtype=np.float32)
+        self._alt = np.zeros((capacity, history), dtype=np.float32)
+        self._vel = np.zeros((capacity, history), dtype=np.float32)
+        self._head = np.zeros(capacity, dtype=np.int32)
+        self._count = np.zeros(capacity, dtype=np.int32)
+        self._last_seen = np.full(capacity, -np.inf)
+        self._keys = np.full(capacity, None, dtype=object)
+        self._callsign = np.full(capacity, None, dtype=object)
+        self._zone = np.full(capacity, None, dtype=object)
+        self._slots: Dict[str, int] = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    @property
+    def memory_bytes(self) -> int:
+        arrays = (self._time, self._lat, self._lon, self._alt, self._vel, self._head, self._count,
+                  self._last_seen, self._keys, self._callsign, self._zone)
+        return sum(a.nbytes for a in arrays)
+
+    def _release(self, slots: np.ndarray, now: float, events: List[dict]):
+        for slot in slots.tolist():
+            if self._zone[slot] is not None:
+                events.append(self._event(ZONE_EXIT, slot, self._zone[slot], now))
+            del self._slots[self._keys[slot]]
+            self._keys[slot] = self._callsign[slot] = self._zone[slot] = None
+            self._count[slot] = self._head[slot] = 0
+            self._last_seen[slot] = -np.inf
+            self._free.append(slot)
+        self.evicted += len(slots)
+
+    def _event(self, kind: str, slot: int, zone: str, now: float) -> dict:
+        last = (self._head[slot] - 1) % self.history
+        return {
+            "type": kind,
+            "icao24": self._keys[slot],
+            "callsign": self._callsign[slot],
+            "zone": zone,
+            "latitude": float(self._lat[slot, last]),
+            "longitude": float(self._lon[slot, last]),
+            "time": now,
+        }
+
+    # ✅ Append one cycle of observations and return the zone transitions it caused
+    def update(self, drones: List[dict], now: float) -> List[dict]:
+        events: List[dict] = []
+        with self._lock:
+            # Last observation wins if the feed repeats an aircraft within one snapshot
+            latest = {d.get("icao24") or d["callsign"]: i for i, d in enumerate(drones)}
+            seen = np.array([self._slots[k] for k in latest if k in self._slots], dtype=np.intp)
+
+            # Idle tracks go first, except ones that reappear in this cycle after a gap
+            idle = (self._count > 0) & (self._last_seen < now - self.idle_timeout)
+            idle[seen] = False
+            self._release(np.flatnonzero(idle), now, events)
+
+            new_keys = [k for k in latest if k not in self._slots]
+            shortfall = len(new_keys) - len(self._free)
+            if shortfall > 0:
+                # Make room by dropping the least recently seen tracks that are not in this cycle.
+                # Free slots and tracks seen this cycle sort last so they are never picked.
+                last_seen = self._last_seen.copy()
+                last_seen[seen] = np.inf
+                last_seen[np.array(self._free, dtype=np.intp)] = np.inf
+                shortfall = min(shortfall, int(np.isfinite(last_seen).sum()))
+                if shortfall:
+                    victims = np.argpartition(last_seen, shortfall - 1)[:shortfall]
+                    self._release(victims, now, events)
+                new_keys = new_keys[:len(self._free)]
+            for key in new_keys:
+                slot = self._free.pop()
+                self._slots[key] = slot
+                self._keys[slot] = key
+
+            kept = [(i, self._slots[k]) for k, i in latest.items() if k in self._slots]
+            if not kept:
+                return events
+            rows, slots = (np.array(v, dtype=np.intp) for v in zip(*kept))
+            records = [drones[i] for i in rows.tolist()]
+
+            pos = self._head[slots]
+            self._time[slots, pos] = now
+            self._lat[slots, pos] = [d["latitude"] for d in records]
+            self._lon[slots, pos] = [d["longitude"] for d in records]
+            self._alt[slots, pos] = [d.get("altitude") or 0.0 for d in records]
+            self._vel[slots, pos] = [d.get("velocity") or 0.0 for d in records]
+            self._head[slots] = (pos + 1) % self.history
+            self._count[slots] = np.minimum(self._count[slots] + 1, self.history)
+            self._last_seen[slots] = now
+            self._callsign[slots] = [d["callsign"] for d in records]
+
+            zones = np.array([d["zone"] if d["unauthorized"] else None for d in records], dtype=object)
+            previous = self._zone[slots]
+            self._zone[slots] = zones
+            for slot, old, new in zip(slots.tolist(), previous.tolist(), zones.tolist()):
+                if old == new:
+                    continue
+                if old is not None:
+                    events.append(self._event(ZONE_EXIT, slot, old, now))
+                if new is not None:
+                    events.append(self._event(ZONE_ENTER, slot, new, now))
+        return events
+
+    def _summary(self, slot: int) -> dict:
+        last = (self._head[slot] - 1) % self.history
+        return {
+            "icao24": self._keys[slot],
+            "callsign": self._callsign[slot],
+            "zone": self._zone[slot],
+            "last_seen": float(self._last_seen[slot]),
+            "latitude": float(self._lat[slot, last]),
+            "longitude": float(self._lon[slot, last]),
+            "altitude": float(self._alt[slot, last]),
+            "velocity": float(self._vel[slot, last]),
+        }
+
+    def get(self, key: str) -> Optional[dict]:
+        """One track with its buffered points, oldest first."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return None
+            count = int(self._count[slot])
+            order = (self._head[slot] - count + np.arange(count)) % self.history
+            track = self._summary(slot)
+            track["points"] = [
+                {"time": t, "latitude": la, "longitude": lo, "altitude": a, "velocity": v}
+                for t, la, lo, a, v in zip(
+                    self._time[slot, order].tolist(), self._lat[slot, order].tolist(), self._lon[slot, order].tolist(),
+                    self._alt[slot, order].tolist(), self._vel[slot, order].tolist(),
+                )
+            ]
+            return track
+
+    def query_bbox(self, lamin: float, lomin: float, lamax: float, lomax: float, limit: int = 1000) -> List[dict]:
+        """Latest position of every track currently inside the box."""
+        with self._lock:
+            slots = np.flatnonzero(self._count > 0)
+            last = (self._head[slots] - 1) % self.history
+            lat, lon = self._lat[slots, last], self._lon[slots, last]
+            inside = (lat >= lamin) & (lat <= lamax) & (lon >= lomin) & (lon <= lomax)
+            return [self._summary(slot) for slot in slots[inside][:limit].tolist()]
+
+    def stats(self) -> dict:
+        return {"active_tracks": len(self._slots), "capacity": self.capacity, "evicted": self.evicted, "memory_bytes": self.memory_bytes}
@@ -0,0 +1,283 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from geofence import EARTH_RADIUS_KM, haversine_np
+
+# Same sphere as the haversine test, so bounding boxes never come out smaller than the circles
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Slack added around every circle's bounding box (degrees, ~0.1 m) to absorb rounding
+BBOX_MARGIN_DEG = 1e-6
+
+# ✅ Built-in restricted zones, used when no RESTRICTED_ZONES_FILE is configured
+RESTRICTED_ZONES = [
+    {"name": "JFK Airport", "latitude": 40.6413, "longitude": -73.7781, "radius": 10},
+    {"name": "Los Angeles Airport", "latitude": 33.9416, "longitude": -118.4085, "radius": 10},
+    {"name": "Hartsfield-Jackson Atlanta Airport", "latitude": 33.6407, "longitude": -84.4277, "radius": 10},
+    {"name": "Denver International Airport", "latitude": 39.8561, "longitude": -104.6737, "radius": 10},
+    {"name": "Chicago O'Hare Airport", "latitude": 41.9742, "longitude": -87.9073, "radius": 10},
+    {"name": "Pentagon", "latitude": 38.8719, "longitude": -77.0563, "radius": 5},
+    {"name": "Area 51", "latitude": 37.2431, "longitude": -115.7930, "radius": 15},
+]
+
+
+# ✅ Normalize a zone definition into the shape the index and the frontend expect
+def normalize_zone(zone: dict) -> dict:
+    """Return a copy of ``zone`` with shape, bounding box and altitude band filled in.
+
+    Circles use ``latitude``/``longitude``/``radius`` (km). Polygons use ``polygon``, a list of
+    ``[latitude, longitude]`` vertices; they also get a centroid and a bounding radius so
+    clients that only draw circles still have something to show. ``floor`` and ``ceiling``
+    are optional altitude limits in metres.
+    """
+    zone = dict(zone)
+    if "polygon" in zone:
+        vertices = np.asarray(zone["polygon"], dtype=np.float64)
+        if vertices.ndim != 2 or vertices.shape[0] < 3 or vertices.shape[1] != 2:
+            raise ValueError(f"Zone {zone.get('name')!r} needs at least three [lat, lon] vertices")
+        zone["shape"] = "polygon"
+        zone.setdefault("latitude", float(vertices[:, 0].mean()))
+        zone.setdefault("longitude", float(vertices[:, 1].mean()))
+        zone.setdefault("radius", float(haversine_np(zone["latitude"], zone["longitude"], vertices[:, 0], vertices[:, 1]).max()))
+        bbox = [vertices[:, 0].min(), vertices[:, 1].min(), vertices[:, 0].max(), vertices[:, 1].max()]
+    else:
+        zone["shape"] = "circle"
+        # Exact extent of a spherical cap: the latitude span is the angular radius, the widest
+        # longitude span is asin(sin(d) / cos(lat)), and a cap reaching a pole spans every longitude
+        d = zone["radius"] / EARTH_RADIUS_KM
+        dlat = math.degrees(d) + BBOX_MARGIN_DEG
+        ratio = math.sin(min(d, math.pi / 2)) / max(math.cos(math.radians(zone["latitude"])), 1e-12)
+        dlon = math.degrees(math.asin(ratio)) + BBOX_MARGIN_DEG if ratio < 1 else 180.0
+        bbox = [zone["latitude"] - dlat, zone["longitude"] - dlon, zone["latitude"] + dlat, zone["longitude"] + dlon]
+
+    zone["bbox"] = [float(max(bbox[0], -90.0)), float(bbox[1]), float(min(bbox[2], 90.0)), float(bbox[3])]
+    zone.setdefault("floor", None)
+    zone.setdefault("ceiling", None)
+    return zone
+
+
+def _expand(starts, counts):
+    """Flat indices ``starts[i] .. starts[i] + counts[i] - 1`` for every i, concatenated."""
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+
+def _hash_cells(keys, bits):
+    # Fibonacci hashing: multiply by 2^64 / golden ratio and keep the top ``bits`` bits
+    return ((keys.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(64 - bits)).astype(np.int64)
+
+
+class ZoneIndex:
+    """Uniform lat/lon grid over restricted zones.
+
+    Each zone is registered in every grid cell its bounding box touches. A lookup finds each
+    point's cell in an open-addressing hash table and runs the exact circle/polygon test only
+    against the zones bucketed in that cell, so the per-point cost depends on local zone
+    density rather than the zone count.
+    """
+
+    def __init__(self, zones: List[dict], cell_deg: Optional[float] = None):
+        self.zones = [normalize_zone(z) for z in zones]
+        self._bboxes = np.array([z["bbox"] for z in self.zones], dtype=np.float64).reshape(-1, 4)
+        if cell_deg is None:
+            # Cells about the size of a typical zone keep both the candidate lists and the bucket count small
+            spans = self._bboxes[:, 2] - self._bboxes[:, 0]
+            cell_deg = float(np.clip(np.median(spans), 0.05, 1.0)) if len(spans) else 1.0
+        self.cell_deg = cell_deg
+        self._cols = int(math.ceil(360 / cell_deg))
+        self._rows = int(math.ceil(180 / cell_deg))
+        self._names = np.array([z["name"] for z in self.zones] + ["None"], dtype=object)
+        self._lat = np.array([z["latitude"] for z in self.zones], dtype=np.float64)
+        self._lon = np.array([z["longitude"] for z in self.zones], dtype=np.float64)
+        self._radius = np.array([z["radius"] for z in self.zones], dtype=np.float64)
+        self._floor = np.array([-np.inf if z["floor"] is None else z["floor"] for z in self.zones], dtype=np.float64)
+        self._ceiling = np.array([np.inf if z["ceiling"] is None else z["ceiling"] for z in self.zones], dtype=np.float64)
+        self._is_polygon = np.array([z["shape"] == "polygon" for z in self.zones], dtype=bool)
+
+        # Polygon edges, flattened so every (point, polygon) pair is ray-cast in one vectorized pass.
+        # Horizontal edges never cross a horizontal ray, so they are left out.
+        edges = []
+        self._edge_len = np.zeros(len(self.zones), dtype=np.int64)
+        for i, z in enumerate(self.zones):
+            if z["shape"] == "polygon":
+                a = np.asarray(z["polygon"], dtype=np.float64)
+                b = np.roll(a, -1, axis=0)
+                keep = a[:, 0] != b[:, 0]
+                edges.append(np.hstack([a[keep], b[keep]]))
+                self._edge_len[i] = int(keep.sum())
+        self._edge_start = np.cumsum(self._edge_len) - self._edge_len
+        self._edges = np.vstack(edges) if edges else np.empty((0, 4), dtype=np.float64)
+
+        buckets = {}
+        for i, (lamin, lomin, lamax, lomax) in enumerate(self._bboxes.tolist()):
+            row_lo, row_hi = self._row(lamin), self._row(lamax)
+            col_lo = int(math.floor((lomin + 180) / cell_deg))
+            col_hi = min(int(math.floor((lomax + 180) / cell_deg)), col_lo + self._cols - 1)
+            for row in range(row_lo, row_hi + 1):
+                for col in range(col_lo, col_hi + 1):
+                    buckets.setdefault(row * self._cols + col % self._cols, []).append(i)
+
+        # CSR layout: each occupied cell's zone ids as a slice of one flat array
+        cell_keys = list(buckets)
+        self._bucket_len = np.array([len(buckets[k]) for k in cell_keys], dtype=np.int64)
+        self._bucket_start = np.cumsum(self._bucket_len) - self._bucket_len
+        self._bucket_zones = np.array([i for k in cell_keys for i in buckets[k]], dtype=np.intp)
+
+        # Cell key -> bucket through a linear-probing hash table kept at most a quarter full
+        self._hash_bits = max(4, int(math.ceil(math.log2(4 * max(len(cell_keys), 1)))))
+        mask = (1 << self._hash_bits) - 1
+        table_keys, table_buckets = [-1] * (mask + 1), [0] * (mask + 1)
+        self._max_probe = 0
+        homes = _hash_cells(np.array(cell_keys, dtype=np.int64), self._hash_bits).tolist()
+        for bucket, (key, pos) in enumerate(zip(cell_keys, homes)):
+            probe = 0
+            while table_keys[(pos + probe) & mask] != -1:
+                probe += 1
+            table_keys[(pos + probe) & mask], table_buckets[(pos + probe) & mask] = key, bucket
+            self._max_probe = max(self._max_probe, probe)
+        self._hash_keys = np.array(table_keys, dtype=np.int64)
+        self._hash_bucket = np.array(table_buckets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def _row(self, latitude):
+        return min(max(int(math.floor((latitude + 90) / self.cell_deg)), 0), self._rows - 1)
+
+    def _cell_keys(self, latitude, longitude):
+        rows = np.clip(np.floor((latitude + 90) / self.cell_deg).astype(np.int64), 0, self._rows - 1)
+        cols = np.floor((longitude + 180) / self.cell_deg).astype(np.int64) % self._cols
+        return rows * self._cols + cols
+
+    def _find_buckets(self, keys):
+        """Bucket number for each cell key, -1 for cells without zones."""
+        mask = len(self._hash_keys) - 1
+        pos = _hash_cells(keys, self._hash_bits)
+        bucket = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        for _ in range(self._max_probe + 1):
+            found = self._hash_keys[pos[pending]]
+            match = found == keys[pending]
+            bucket[pending[match]] = self._hash_bucket[pos[pending[match]]]
+            pending = pending[~match & (found != -1)]
+            if not len(pending):
+                break
+            pos[pending] = (pos[pending] + 1) & mask
+        return bucket
+
+    # ✅ Batch lookup: index of the first matching zone per point, -1 when none
+    def lookup(self, latitude, longitude, altitude=None) -> np.ndarray:
+        latitude = np.atleast_1d(np.asarray(latitude, dtype=np.float64))
+        longitude = np.atleast_1d(np.asarray(longitude, dtype=np.float64))
+        result = np.full(len(latitude), -1, dtype=np.intp)
+        if not len(self.zones) or not len(latitude):
+            return result
+
+        # Find each point's cell, keeping only points whose cell holds at least one zone
+        bucket = self._find_buckets(self._cell_keys(latitude, longitude))
+        point_ids = np.flatnonzero(bucket >= 0)
+        if not len(point_ids):
+            return result
+
+        # Expand to one (point, candidate zone) pair per zone bucketed in the point's cell
+        counts = self._bucket_len[bucket[point_ids]]
+        pair_point = np.repeat(point_ids, counts)
+        pair_zone = self._bucket_zones[_expand(self._bucket_start[bucket[point_ids]], counts)]
+
+        # Exact tests on candidates only: haversine for circles, even-odd ray casting for polygons
+        lat, lon = latitude[pair_point], longitude[pair_point]
+        hit = haversine_np(lat, lon, self._lat[pair_zone], self._lon[pair_zone]) <= self._radius[pair_zone]
+        pairs = np.flatnonzero(self._is_polygon[pair_zone])
+        if len(pairs):
+            edge_counts = self._edge_len[pair_zone[pairs]]
+            edge_pair = np.repeat(pairs, edge_counts)
+            y1, x1, y2, x2 = self._edges[_expand(self._edge_start[pair_zone[pairs]], edge_counts)].T
+            y, x = lat[edge_pair], lon[edge_pair]
+            crossings = ((y1 > y) != (y2 > y)) & (x < x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+            parity = np.bincount(edge_pair[crossings], minlength=len(hit)) % 2 == 1
+            hit[pairs] = parity[pairs]
+        if altitude is not None:
+            # Unknown altitude is treated as inside the band so a missing barometer never hides an intrusion
+            alt = np.atleast_1d(np.asarray(altitude, dtype=np.float64))[pair_point]
+            hit &= np.isnan(alt) | ((alt >= self._floor[pair_zone]) & (alt <= self._ceiling[pair_zone]))
+
+        # Lowest zone index wins, matching the order of the zone list
+        best = np.full(len(latitude), len(self.zones), dtype=np.intp)
+        np.minimum.at(best, pair_point[hit], pair_zone[hit])
+        result[best < len(self.zones)] = best[best < len(self.zones)]
+        return result
+
+    def zone_names(self, zone_idx: np.ndarray) -> np.ndarray:
+        """Map lookup indices to zone names, with "None" for points outside every zone."""
+        return self._names[zone_idx]
+
+    # ✅ Zones whose bounding box intersects the query box
+    def query_bbox(self, lamin: float, lomin: float, lamax: float, lomax: float) -> List[dict]:
+        b = self._bboxes
+        hit = (b[:, 0] <= lamax) & (b[:, 2] >= lamin) & (b[:, 1] <= lomax) & (b[:, 3] >= lomin)
+        return [self.zones[i] for i in np.flatnonzero(hit).tolist()]
+
+    # ✅ Union of all zone bounding boxes, used to scope OpenSky requests
+    def bounds(self, margin_deg: float = 0.5) -> Optional[Tuple[float, float, float, float]]:
+        """Smallest lamin/lomin/lamax/lomax box covering every zone, or None for the whole planet."""
+        if not len(self.zones):
+            return None
+        b = self._bboxes
+        lamin, lamax = max(b[:, 0].min() - margin_deg, -90.0), min(b[:, 2].max() + margin_deg, 90.0)
+        lomin, lomax = b[:, 1].min() - margin_deg, b[:, 3].max() + margin_deg
+        if lomin < -180.0 or lomax > 180.0:
+            return None
+        return tuple(round(float(v), 4) for v in (lamin, lomin, lamax, lomax))
+
+
+def load_zones_file(path: str) -> List[dict]:
+    """Read zones from a JSON file holding either a list or ``{"restricted_zones": [...]}``."""
+    with open(path) as f:
+        data = json.load(f)
+    return data["restricted_zones"] if isinstance(data, dict) else data
+
+
+class ZoneRegistry:
+    """Holds the live ZoneIndex and rebuilds it when the zones file changes on disk.
+
+    ``check_reload`` is cheap enough to call every cycle: it stats the file at most once per
+    ``poll_interval`` seconds, and a broken file keeps the previous index in service.
+    """
+
+    def __init__(self, path: Optional[str], default_zones: List[dict], poll_interval: float = 5.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._default_zones = default_zones
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.index = ZoneIndex(default_zones)
+        self.check_reload(force=True)
+
+    def check_reload(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not self.path or (not force and now - self._last_check < self.poll_interval):
+            return False
+        with self._lock:
+            self._last_check = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                return False
+            if mtime == self._mtime:
+                return False
+            try:
+                index = ZoneIndex(load_zones_file(self.path))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logging.error(f"❌ Failed to load restricted zones from {self.path}: {e}")
+                self._mtime = mtime
+                return False
+            self.index, self._mtime = index, mtime
+        logging.info(f"✅ Loaded {len(index)} restricted zones from {self.path}")
+        return True